@@ -14,11 +14,22 @@ try:
 except ImportError:
     PLOTLY_AVAILABLE = False
 from data.cleaners_data import (
-    get_cleaners_dataframe, 
     get_cleaner_reviews, 
+    add_review,
     get_cleaner_availability,
     CLEANERS_DATA
 )
+from data.catalog import get_catalog
+from data.cleaner_query import CleanerQuery, find_cleaners
+from data.facets import cleaner_facets
+from data.similarity import similar_cleaners
+from data.availability import HORIZON_DAYS, bookable_durations, reserve_slots, slot_has_started
+from data.reservations import SlotConflict
+from data.ids import new_id
+from data.loader import start_catalog_reloader
+
+# Serve the catalog from $CLEANFEE_CATALOG_PATH when set, picking up edits without a restart
+start_catalog_reloader()
 
 # Facebook Business Integration Configuration
 FACEBOOK_PAGE_ID = st.secrets.get("FACEBOOK_PAGE_ID", "100078488780737")  # Your page ID
@@ -1059,11 +1070,14 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Cleaner cards rendered per screenful on the home page
+CARDS_PER_PAGE = 10
+
 # Initialize session state
 if 'page' not in st.session_state:
     st.session_state.page = 'home'
-if 'selected_cleaner' not in st.session_state:
-    st.session_state.selected_cleaner = None
+if 'selected_cleaner_id' not in st.session_state:
+    st.session_state.selected_cleaner_id = None
 if 'bookings' not in st.session_state:
     st.session_state.bookings = []
 if 'completed_bookings' not in st.session_state:
@@ -1073,7 +1087,9 @@ if 'favorites' not in st.session_state:
 if 'search_query' not in st.session_state:
     st.session_state.search_query = ""
 if 'sort_by' not in st.session_state:
-    st.session_state.sort_by = "rating"
+    st.session_state.sort_by = "relevance"
+if 'cards_shown' not in st.session_state:
+    st.session_state.cards_shown = CARDS_PER_PAGE
 if 'notifications' not in st.session_state:
     st.session_state.notifications = []
 if 'user_profile' not in st.session_state:
@@ -1242,7 +1258,8 @@ def display_mobile_cleaner_card(cleaner):
     heart_class = "heart-filled" if is_favorite else "heart-empty"
     
     # Availability status
-    availability_status = "🟢 Available Today" if cleaner['id'] % 2 == 0 else "🟡 Busy Today"
+    open_today = [slot for slot in get_cleaner_availability(cleaner['id'], date.today()) if not slot_has_started(date.today(), slot)]
+    availability_status = f"🟢 {len(open_today)} slots open today" if open_today else "🟡 Busy Today"
     
     stars = "⭐" * int(cleaner['rating'])
     skills_html = " ".join([f'<span class="mobile-skill-tag">{skill}</span>' for skill in cleaner['skills']])
@@ -1282,13 +1299,13 @@ def display_mobile_cleaner_card(cleaner):
     col1, col2, col3 = st.columns([2, 2, 1])
     with col1:
         if st.button(f"📅 Book Now", key=f"select_{cleaner['id']}", help="Book this cleaner", use_container_width=True):
-            st.session_state.selected_cleaner = cleaner.to_dict()
+            st.session_state.selected_cleaner_id = cleaner['id']
             st.session_state.page = 'booking'
             st.rerun()
     
     with col2:
         if st.button(f"⭐ Reviews", key=f"reviews_{cleaner['id']}", help="View reviews", use_container_width=True):
-            st.session_state.selected_cleaner = cleaner.to_dict()
+            st.session_state.selected_cleaner_id = cleaner['id']
             st.session_state.page = 'reviews'
             st.rerun()
     
@@ -1358,8 +1375,11 @@ def home_page():
     
     # Sort options with pills
     st.markdown("**Sort by:**")
-    col1, col2, col3, col4 = st.columns(4)
+    col0, col1, col2, col3, col4 = st.columns(5)
     
+    with col0:
+        if st.button("🏆 Best Match", key="sort_relevance", use_container_width=True):
+            st.session_state.sort_by = "relevance"
     with col1:
         if st.button("⭐ Rating", key="sort_rating", use_container_width=True):
             st.session_state.sort_by = "rating"
@@ -1377,18 +1397,25 @@ def home_page():
     with st.expander("🔧 Advanced Filters", expanded=False):
         st.markdown('<div class="filter-title">Customize Your Search</div>', unsafe_allow_html=True)
         
+        # Filter choices and live counts come from the catalog facets for the current search
+        facets = cleaner_facets(CleanerQuery.build(q=search_query))
+        rate_min, rate_max = facets['hourly_rate']['min'], facets['hourly_rate']['max']
+        experience_counts = {b['min_years']: b['count'] for b in facets['experience']}
+        skill_counts = {f['skill']: f['count'] for f in facets['skills']}
+        
         col1, col2 = st.columns(2)
         with col1:
-            price_range = st.slider("💰 Hourly Rate", 15, 35, (15, 35), 1, help="Set your budget range")
+            price_range = st.slider("💰 Hourly Rate", rate_min, rate_max, (rate_min, rate_max), 1, help="Set your budget range")
             min_rating = st.slider("⭐ Minimum Rating", 1.0, 5.0, 4.0, 0.1, help="Filter by rating")
         
         with col2:
-            experience_filter = st.selectbox("🎯 Experience Level", [0, 2, 5, 7], index=0, 
-                                            format_func=lambda x: f"{x}+ years" if x > 0 else "Any experience")
+            experience_filter = st.selectbox("🎯 Experience Level", list(experience_counts), index=0, 
+                                            format_func=lambda x: (f"{x}+ years" if x > 0 else "Any experience") + f" ({experience_counts[x]})")
             
             skill_filter = st.multiselect("🛠️ Required Skills", 
-                                        ["Deep Cleaning", "Eco-friendly", "Pet-friendly", "Move-in/out", 
-                                         "Kitchen Deep Clean", "Premium Service", "Same-day Service"])
+                                        list(skill_counts),
+                                        format_func=lambda skill: f"{skill} ({skill_counts[skill]})")
+            match_all_skills = st.checkbox("🔗 Require all selected skills")
         
         availability_filter = st.selectbox("📅 Availability", 
                                          ["Any time", "Available Today", "Available This Week"])
@@ -1396,46 +1423,35 @@ def home_page():
         # Favorites only toggle
         favorites_only = st.checkbox("💖 Show Favorites Only")
     
-    # Get and filter cleaners
-    cleaners_df = get_cleaners_dataframe()
-    
-    # Apply search filter
-    if search_query:
-        mask = (
-            cleaners_df['name'].str.contains(search_query, case=False, na=False) |
-            cleaners_df['bio'].str.contains(search_query, case=False, na=False) |
-            cleaners_df['skills'].astype(str).str.contains(search_query, case=False, na=False)
-        )
-        cleaners_df = cleaners_df[mask]
-    
-    # Apply other filters
-    filtered_cleaners = cleaners_df[
-        (cleaners_df['hourly_rate'] >= price_range[0]) &
-        (cleaners_df['hourly_rate'] <= price_range[1]) &
-        (cleaners_df['rating'] >= min_rating) &
-        (cleaners_df['experience_years'] >= experience_filter)
-    ]
-    
-    # Apply skill filter
-    if skill_filter:
-        skill_mask = filtered_cleaners['skills'].apply(
-            lambda skills: any(skill in skills for skill in skill_filter)
-        )
-        filtered_cleaners = filtered_cleaners[skill_mask]
+    # "Available" means at least one open slot on some day of the window
+    today = date.today()
+    available_from = available_to = None
+    if availability_filter == "Available Today":
+        available_from = available_to = today
+    elif availability_filter == "Available This Week":
+        available_from, available_to = today, today + timedelta(days=6)
+    
+    # Get filtered, sorted cleaners from the shared result cache
+    catalog = get_catalog()
+    query = CleanerQuery.build(
+        q=search_query,
+        min_rating=min_rating,
+        min_rate=price_range[0],
+        max_rate=price_range[1],
+        min_experience=experience_filter,
+        skills=skill_filter,
+        match_all_skills=match_all_skills,
+        ids=st.session_state.favorites if favorites_only else None,
+        available_from=available_from,
+        available_to=available_to,
+        sort=st.session_state.sort_by,
+    )
+    matches = find_cleaners(query, catalog)
+    total_matches = len(matches)
     
-    # Apply favorites filter
-    if favorites_only:
-        filtered_cleaners = filtered_cleaners[filtered_cleaners['id'].isin(st.session_state.favorites)]
-    
-    # Apply sorting
-    if st.session_state.sort_by == "rating":
-        filtered_cleaners = filtered_cleaners.sort_values('rating', ascending=False)
-    elif st.session_state.sort_by == "price":
-        filtered_cleaners = filtered_cleaners.sort_values('hourly_rate', ascending=True)
-    elif st.session_state.sort_by == "experience":
-        filtered_cleaners = filtered_cleaners.sort_values('experience_years', ascending=False)
-    elif st.session_state.sort_by == "reviews":
-        filtered_cleaners = filtered_cleaners.sort_values('total_reviews', ascending=False)
+    # Only the first screenful is rendered
+    positions, next_cursor = catalog.page(matches, query.sort, st.session_state.cards_shown)
+    filtered_cleaners = catalog.rows(positions)
     
     # Results count with emoji and filters applied
     filter_info = []
@@ -1445,17 +1461,19 @@ def home_page():
         filter_info.append("favorites")
     if skill_filter:
         filter_info.append(f"with {', '.join(skill_filter)}")
+    if available_from:
+        filter_info.append(availability_filter.lower())
     
     filter_text = f" ({', '.join(filter_info)})" if filter_info else ""
     
     st.markdown(f"""
     <div style="text-align: center; padding: 1rem 0; font-size: 1.1rem; font-weight: 600; color: #2c3e50;">
-        👥 {len(filtered_cleaners)} Professional Cleaners Available{filter_text}
+        👥 {total_matches} Professional Cleaners Available{filter_text}
     </div>
     """, unsafe_allow_html=True)
     
     # No results message
-    if len(filtered_cleaners) == 0:
+    if total_matches == 0:
         st.markdown("""
         <div style="text-align: center; padding: 2rem; color: #7f8c8d;">
             <div style="font-size: 3rem; margin-bottom: 1rem;">🔍</div>
@@ -1466,20 +1484,25 @@ def home_page():
         return
     
     # Display mobile cleaner cards with loading animation
-    for i, (_, cleaner) in enumerate(filtered_cleaners.iterrows()):
+    for i, cleaner in enumerate(filtered_cleaners):
         # Add small delay effect for animation
         if i < 3:  # Only animate first 3 cards
             st.markdown(f'<div class="fade-in" style="animation-delay: {i*0.1}s;"></div>', unsafe_allow_html=True)
         display_mobile_cleaner_card(cleaner)
+    
+    # Load the next screenful on demand
+    if next_cursor:
+        if st.button("⬇️ Show More Cleaners", key="show_more_cleaners", use_container_width=True):
+            st.session_state.cards_shown += CARDS_PER_PAGE
+            st.rerun()
 
 def booking_page():
     """Display mobile-optimized booking page"""
-    if st.session_state.selected_cleaner is None:
+    cleaner = get_catalog().get(st.session_state.selected_cleaner_id)
+    if cleaner is None:
         st.error("No cleaner selected. Please go back to home page.")
         return
     
-    cleaner = st.session_state.selected_cleaner
-    
     # Mobile header
     st.markdown(f"""
     <div class="app-header">
@@ -1512,18 +1535,23 @@ def booking_page():
     selected_date = st.date_input(
         "",
         min_value=date.today(),
-        max_value=date.today() + timedelta(days=30)
+        max_value=date.today() + timedelta(days=HORIZON_DAYS - 1)
     )
     
-    # Get availability for selected date
-    available_slots = get_cleaner_availability(cleaner['id'], selected_date)
+    # Get availability for selected date, leaving out slots earlier today that have already started
+    available_slots = [
+        slot for slot in get_cleaner_availability(cleaner['id'], selected_date)
+        if not slot_has_started(selected_date, slot)
+    ]
     
     if available_slots:
         st.markdown('<div class="mobile-form-label">⏰ Available Time Slots</div>', unsafe_allow_html=True)
         selected_time = st.selectbox("", available_slots)
         
         st.markdown('<div class="mobile-form-label">⏱️ Cleaning Duration</div>', unsafe_allow_html=True)
-        duration = st.selectbox("", [1, 2, 3, 4, 5], index=1, format_func=lambda x: f"{x} hour{'s' if x != 1 else ''}")
+        # Only lengths that fit the cleaner's consecutive free hours from the chosen start
+        durations = bookable_durations(cleaner['id'], selected_date, selected_time)
+        duration = st.selectbox("", durations, index=min(1, len(durations) - 1), format_func=lambda x: f"{x} hour{'s' if x != 1 else ''}")
         
         st.markdown('<div class="mobile-form-label">➕ Additional Services (optional)</div>', unsafe_allow_html=True)
         services = st.multiselect(
@@ -1565,8 +1593,18 @@ def booking_page():
                 missing_fields.append("Address")
             
             if not missing_fields:
+                # Reserve first: someone else may have taken the slot since the page loaded
+                if slot_has_started(selected_date, selected_time):
+                    st.error("Sorry, that time has already started. Please pick a later slot.")
+                    return
+                try:
+                    reserve_slots(cleaner['id'], selected_date, selected_time, duration)
+                except SlotConflict:
+                    st.error("Sorry, that time was just booked by someone else. Please pick another slot.")
+                    return
+                
                 booking = {
-                    'id': len(st.session_state.bookings) + len(st.session_state.completed_bookings) + 1,
+                    'id': new_id("CF-"),
                     'cleaner_id': cleaner['id'],
                     'cleaner_name': cleaner['name'],
                     'cleaner_image': cleaner['image_url'],
@@ -1618,7 +1656,7 @@ def booking_page():
                         <div><strong>Time:</strong> {selected_time}</div>
                         <div><strong>Duration:</strong> {duration} hour{'s' if duration != 1 else ''}</div>
                         <div><strong>Total:</strong> ${total_cost:.2f}</div>
-                        <div><strong>Booking ID:</strong> #{booking['id']:03d}</div>
+                        <div><strong>Booking ID:</strong> #{booking['id']}</div>
                     </div>
                 </div>
                 """, unsafe_allow_html=True)
@@ -1630,12 +1668,11 @@ def booking_page():
 
 def reviews_page():
     """Display mobile-optimized reviews page"""
-    if st.session_state.selected_cleaner is None:
+    cleaner = get_catalog().get(st.session_state.selected_cleaner_id)
+    if cleaner is None:
         st.error("No cleaner selected.")
         return
     
-    cleaner = st.session_state.selected_cleaner
-    
     # Mobile header with back button
     st.markdown(f"""
     <div class="app-header">
@@ -1673,6 +1710,13 @@ def reviews_page():
             <div class="review-date">{review['date']}</div>
         </div>
         """, unsafe_allow_html=True)
+    
+    # Alternatives in case this cleaner is booked up
+    positions, _ = similar_cleaners(cleaner['id'], limit=3)
+    if len(positions):
+        st.markdown("### 👥 Similar Cleaners")
+        for similar in get_catalog().rows(positions):
+            display_mobile_cleaner_card(similar)
 
 def my_bookings_page():
     """Display mobile-optimized bookings page"""
@@ -1697,7 +1741,7 @@ def my_bookings_page():
                 col1, col2, col3 = st.columns([2, 1, 1])
                 
                 with col1:
-                    st.markdown(f"**#{booking['id']:03d} - {booking['cleaner_name']}**")
+                    st.markdown(f"**#{booking['id']} - {booking['cleaner_name']}**")
                     st.markdown(f"📅 {booking['date']} at {booking['time']}")
                     st.markdown(f"⏱️ {booking['duration']} hour(s)")
                     st.markdown(f"💰 ${booking['total_cost']:.2f}")
@@ -1723,7 +1767,7 @@ def my_bookings_page():
                 col1, col2 = st.columns([2, 1])
                 
                 with col1:
-                    st.markdown(f"**#{booking['id']:03d} - {booking['cleaner_name']}**")
+                    st.markdown(f"**#{booking['id']} - {booking['cleaner_name']}**")
                     st.markdown(f"📅 {booking['date']} at {booking['time']}")
                     st.markdown(f"💰 ${booking['total_cost']:.2f}")
                 
@@ -1745,6 +1789,12 @@ def my_bookings_page():
                         if st.button(f"Submit Rating", key=f"submit_rating_{booking['id']}"):
                             booking['user_rating'] = rating
                             booking['user_comment'] = comment
+                            add_review(booking['cleaner_id'], {
+                                'user': booking['customer_name'],
+                                'rating': rating,
+                                'comment': comment,
+                                'date': datetime.now().strftime('%Y-%m-%d')
+                            })
                             st.success("Thank you for your feedback!")
                             st.rerun()
                     else:
@@ -1947,8 +1997,7 @@ def favorites_page():
         return
     
     # Get favorite cleaners
-    cleaners_df = get_cleaners_dataframe()
-    favorite_cleaners = cleaners_df[cleaners_df['id'].isin(st.session_state.favorites)]
+    favorite_cleaners = get_catalog().get_many(st.session_state.favorites)
     
     st.markdown(f"""
     <div style="text-align: center; padding: 1rem 0; font-size: 1.1rem; font-weight: 600; color: #2c3e50;">
@@ -1962,7 +2011,7 @@ def favorites_page():
         st.rerun()
     
     # Display favorite cleaners
-    for _, cleaner in favorite_cleaners.iterrows():
+    for cleaner in favorite_cleaners:
         display_mobile_cleaner_card(cleaner)
 
 def admin_panel():
@@ -3128,7 +3177,7 @@ def show_application_review():
         if st.button("🚀 Submit Application", type="primary", use_container_width=True):
             if terms_agreed:
                 # Submit application
-                application_id = f"APP{len(st.session_state.cleaner_applications) + 1:04d}"
+                application_id = new_id("APP-")
                 
                 final_application = st.session_state.current_application.copy()
                 final_application.update({
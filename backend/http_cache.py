@@ -0,0 +1,47 @@
+import hashlib
+import secrets
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+
+# Version counters restart with the process, so every ETag carries a per-process
+# token: a restarted (or different) worker never matches an ETag it did not issue.
+_EPOCH = secrets.token_hex(4)
+
+CATALOG_CACHE_CONTROL = "public, no-cache"
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag from version parts"""
+    return '"' + "-".join([_EPOCH, *(str(p) for p in parts)]) + '"'
+
+
+def digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def query_digest(request: Request) -> str:
+    """Digest of the query parameters, independent of their order"""
+    return digest("&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items())))
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match matches ``etag`` (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def cache_headers(etag: str, cache_control: str = CATALOG_CACHE_CONTROL) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def not_modified(request: Request, etag: str, cache_control: str = CATALOG_CACHE_CONTROL) -> Optional[Response]:
+    """A 304 response when the client's copy is current, else ``None``"""
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers=cache_headers(etag, cache_control))
+    return None
@@ -5,11 +5,22 @@ from .routers.cleaners import router as cleaners_router
 from .routers.bookings import router as bookings_router
 from .routers.applications import router as applications_router
 from .routers.facebook import router as facebook_router
+from .routers.availability import router as availability_router
+from .routers.bookings import sync_reservations
+from data.catalog import get_catalog
+from data.loader import start_catalog_reloader
 
 
 def create_app() -> FastAPI:
     app = FastAPI(title="CleanFee API", version="0.1.0")
 
+    # Build the cleaner catalog once at startup rather than on the first request,
+    # from $CLEANFEE_CATALOG_PATH (watched for changes) when it is set
+    start_catalog_reloader()
+    get_catalog()
+    # Bookings outlive the process; their slots are taken again in this worker's book
+    sync_reservations(full=True)
+
     # CORS: allow Streamlit local and Streamlit Cloud by default; adjust as needed
     app.add_middleware(
         CORSMiddleware,
@@ -22,6 +33,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag"],
     )
 
     @app.get("/healthz", tags=["system"]) 
@@ -32,6 +44,7 @@ def create_app() -> FastAPI:
     app.include_router(bookings_router, prefix="/api", tags=["bookings"]) 
     app.include_router(applications_router, prefix="/api", tags=["applications"]) 
     app.include_router(facebook_router, prefix="/api", tags=["facebook"]) 
+    app.include_router(availability_router, prefix="/api", tags=["availability"]) 
 
     return app
 
@@ -3,6 +3,9 @@ from pydantic import BaseModel, Field, EmailStr
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from data.ids import new_id
+from ..storage import Repository, get_repository
+
 
 router = APIRouter()
 
@@ -25,26 +28,27 @@ class CleanerApplication(CleanerApplicationCreate):
     created_at: datetime
 
 
-APPLICATIONS: Dict[str, CleanerApplication] = {}
+def applications_repository() -> Repository[CleanerApplication]:
+    return get_repository("applications", CleanerApplication)
 
 
 @router.post("/applications", response_model=CleanerApplication)
 def create_application(payload: CleanerApplicationCreate) -> CleanerApplication:
-    app_id = f"APP-{int(datetime.utcnow().timestamp())}"
+    app_id = new_id("APP-")
     app = CleanerApplication(id=app_id, created_at=datetime.utcnow(), **payload.dict())
-    APPLICATIONS[app_id] = app
-    return app
+    return applications_repository().add(app)
 
 
 @router.get("/applications", response_model=List[CleanerApplication])
 def list_applications() -> List[CleanerApplication]:
-    return list(APPLICATIONS.values())
+    return applications_repository().list()
 
 
 @router.get("/applications/{application_id}", response_model=CleanerApplication)
 def get_application(application_id: str) -> CleanerApplication:
-    if application_id not in APPLICATIONS:
+    app = applications_repository().get(application_id)
+    if app is None:
         raise HTTPException(status_code=404, detail="Application not found")
-    return APPLICATIONS[application_id]
+    return app
 
 
@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from typing import List, Dict, Optional
+from datetime import date, timedelta
+
+from data.availability import HORIZON_DAYS, MAX_DURATION, TIME_SLOTS, get_availability_store
+from data.catalog import get_catalog
+from data.cleaner_query import CleanerQuery
+from data.slot_search import earliest_slots
+
+from .bookings import sync_reservations
+from .cleaners import cleaner_filters, parse_ids
+
+
+router = APIRouter()
+
+MAX_CLEANERS = 500
+MAX_EARLIEST = 100
+
+
+class AvailabilityGrid(BaseModel):
+    start: date = Field(alias="from")
+    end: date = Field(alias="to")
+    # Bit i of a day's mask is slots[i]
+    slots: List[str]
+    # Cleaner id -> one slot bitmask per day from start to end
+    cleaners: Dict[int, List[int]]
+
+
+@router.get("/availability", response_model=AvailabilityGrid)
+def get_availability(
+    cleaner_ids: str = Query(..., description="Comma-separated cleaner ids"),
+    start: Optional[date] = Query(None, alias="from", description="First day (default: today)"),
+    end: Optional[date] = Query(None, alias="to", description="Last day, inclusive (default: start + 6 days)"),
+):
+    ids = parse_ids(cleaner_ids)
+    if len(ids) > MAX_CLEANERS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_CLEANERS} cleaner ids per request")
+    start = start or date.today()
+    end = end or start + timedelta(days=6)
+    if end < start:
+        raise HTTPException(status_code=422, detail="to must not be before from")
+    if (end - start).days >= HORIZON_DAYS:
+        raise HTTPException(status_code=422, detail=f"Date range is limited to {HORIZON_DAYS} days")
+
+    catalog = get_catalog()
+    sync_reservations()
+    # Unknown ids are left out, as with GET /cleaners?ids=
+    known = catalog.ids[catalog.positions(ids)]
+    grid = get_availability_store(catalog).grid(known, start, end)
+    return {
+        "from": start,
+        "to": end,
+        "slots": TIME_SLOTS,
+        "cleaners": {int(cleaner_id): row for cleaner_id, row in zip(known, grid.tolist())},
+    }
+
+
+class SlotOffer(BaseModel):
+    cleaner_id: int
+    name: str
+    hourly_rate: float
+    rating: float
+    date: date
+    time_slot: str
+    duration: int
+
+
+@router.get("/availability/earliest", response_model=List[SlotOffer])
+def get_earliest_slots(
+    filters: CleanerQuery = Depends(cleaner_filters),
+    duration: int = Query(2, ge=1, le=MAX_DURATION, description="Booking length in hours"),
+    limit: int = Query(10, ge=1, le=MAX_EARLIEST),
+):
+    catalog = get_catalog()
+    sync_reservations()
+    matches = earliest_slots(filters.mask(catalog), duration, limit, catalog=catalog)
+    offers = []
+    for match in matches:
+        cleaner = catalog.get(match.cleaner_id)
+        offers.append({
+            "cleaner_id": match.cleaner_id,
+            "name": cleaner["name"],
+            "hourly_rate": cleaner["hourly_rate"],
+            "rating": cleaner["rating"],
+            "date": match.date,
+            "time_slot": match.time_slot,
+            "duration": duration,
+        })
+    return offers
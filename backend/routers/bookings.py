@@ -1,11 +1,32 @@
-from fastapi import APIRouter, HTTPException
+import csv
+import io
+import threading
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
+from datetime import date, datetime
+
+from data.availability import (
+    HOLDING_STATUSES, MAX_DURATION, SLOT_INDEX, booking_hold, drop_slots, get_availability_store, hold_slots,
+    replace_reservations, reserve_slots, slot_has_started,
+)
+from data.catalog import get_catalog
+from data.cursors import MALFORMED, decode_cursor, encode_cursor
+from data.cleaners_data import fold_rating, get_reviews_base_version, record_review
+from data.ids import new_id
+from data.reservations import SlotConflict
+from ..storage import ClaimConflict, PageKey, Repository, get_repository
 
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Bookings read from the store per step of an export
+EXPORT_CHUNK_SIZE = 1000
+
 
 class BookingCreate(BaseModel):
     cleaner_id: int
@@ -14,6 +35,7 @@ class BookingCreate(BaseModel):
     address: str
     date: str
     time_slot: str
+    duration: int = Field(default=1, ge=1, le=MAX_DURATION, description="Hours")
     notes: str | None = None
 
 
@@ -27,20 +49,239 @@ class Booking(BaseModel):
     address: str
     date: str
     time_slot: str
+    duration: int = 1
     notes: str | None = None
+    rating: int | None = None
+    review: str | None = None
+
+
+class BookingStatusUpdate(BaseModel):
+    status: str
+
+
+class BookingRating(BaseModel):
+    rating: int = Field(ge=1, le=5)
+    comment: str | None = None
+
+
+# Status -> statuses a booking may move to from it
+STATUS_TRANSITIONS: Dict[str, Tuple[str, ...]] = {
+    "pending": ("confirmed", "cancelled"),
+    "confirmed": ("completed", "cancelled"),
+    "completed": (),
+    "cancelled": (),
+}
+
+
+def booking_slot_claims(booking: Booking) -> Iterator[Tuple[int, str, int]]:
+    """(cleaner, date, slot) for every hour a holding booking covers"""
+    hold = booking_hold(booking)
+    if hold is None:
+        return
+    cleaner_id, day, bits = hold
+    # Keyed on the parsed day so every spelling of a date claims the same slots
+    for slot in range(bits.bit_length()):
+        if bits >> slot & 1:
+            yield cleaner_id, day.isoformat(), slot
+
+
+# Fields GET /bookings can filter on without scanning every booking
+BOOKING_INDEXES = ("cleaner_id", "date", "status", "customer_phone")
+
+
+def bookings_repository() -> Repository[Booking]:
+    return get_repository("bookings", Booking, claims=booking_slot_claims, indexes=BOOKING_INDEXES)
+
+
+# This worker's view of which stored booking holds which slots, as of _synced_revision
+_SYNC_LOCK = threading.Lock()
+_synced_revision: Optional[int] = None
+_holds: Dict[str, Tuple[int, date, int]] = {}
+
+
+# Stored ratings this worker has listed among its reviews and folded into its catalog,
+# and the review store and catalog build they went into; replacing either starts it over
+_reviewed: Set[str] = set()
+_reviewed_base: Optional[int] = None
+_rated: Set[str] = set()
+_rated_base: Optional[int] = None
+
+
+def _apply_ratings(repo: Repository[Booking], changed: Optional[List[Booking]]) -> None:
+    global _reviewed_base, _rated_base
+    reviews_base, catalog_base = get_reviews_base_version(), get_catalog().base_version
+    if reviews_base != _reviewed_base:
+        _reviewed.clear()
+        _reviewed_base, changed = reviews_base, None
+    if catalog_base != _rated_base:
+        _rated.clear()
+        _rated_base, changed = catalog_base, None
+    if changed is None:
+        changed = repo.find(status="completed")
+    for booking in changed:
+        if booking.rating is None:
+            continue
+        if booking.id not in _reviewed:
+            _reviewed.add(booking.id)
+            record_review(booking.cleaner_id, {
+                "user": booking.customer_name,
+                "rating": booking.rating,
+                "comment": booking.review or "",
+                "date": booking.date,
+            })
+        if booking.id not in _rated:
+            _rated.add(booking.id)
+            fold_rating(booking.cleaner_id, booking.rating)
+
+
+def sync_reservations(full: bool = False) -> None:
+    """Bring this worker's reservation book and ratings in line with the shared booking store
+
+    Workers sharing a store each keep their own book, reviews and catalog, so
+    before reading them they apply whatever bookings other workers added,
+    moved, cancelled or rated since they last looked. ``full`` rebuilds the
+    book from scratch.
+    """
+    global _synced_revision, _holds
+    repo = bookings_repository()
+    with _SYNC_LOCK:
+        revision, changed = repo.changes_since(None if full else _synced_revision)
+        if changed is None:
+            holds = {}
+            for status in HOLDING_STATUSES:
+                for booking in repo.find(status=status):
+                    holds[booking.id] = booking_hold(booking)
+            replace_reservations(holds.values())
+            _holds = holds
+        else:
+            for booking in changed:
+                old, new = _holds.pop(booking.id, None), booking_hold(booking)
+                if new is not None:
+                    _holds[booking.id] = new
+                if old == new:
+                    continue
+                if old is not None:
+                    drop_slots(*old)
+                if new is not None:
+                    hold_slots(*new)
+        _apply_ratings(repo, changed)
+        _synced_revision = revision
+
+
+def _note_hold(booking: Booking) -> None:
+    # Re-mark too: a sync may have dropped the slots while the booking was being stored
+    with _SYNC_LOCK:
+        hold = booking_hold(booking)
+        hold_slots(*hold)
+        _holds[booking.id] = hold
 
 
-BOOKINGS: Dict[str, Booking] = {}
+def booking_filters(
+    cleaner_id: Optional[int] = None,
+    date_: Optional[str] = Query(None, alias="date", description="YYYY-MM-DD"),
+    status: Optional[str] = None,
+    customer_phone: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Indexed ``field=value`` criteria from the query string; 422 if malformed"""
+    criteria: Dict[str, Any] = {}
+    if cleaner_id is not None:
+        criteria["cleaner_id"] = cleaner_id
+    if date_ is not None:
+        try:
+            criteria["date"] = date.fromisoformat(date_).isoformat()
+        except ValueError:
+            raise HTTPException(status_code=422, detail="date must be YYYY-MM-DD")
+    if status is not None:
+        if status not in STATUS_TRANSITIONS:
+            raise HTTPException(status_code=422, detail=f"Unknown status {status!r}")
+        criteria["status"] = status
+    if customer_phone is not None:
+        criteria["customer_phone"] = customer_phone.strip()
+    return criteria
 
 
-@router.get("/bookings", response_model=List[Booking])
-def list_bookings() -> List[Booking]:
-    return list(BOOKINGS.values())
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Booking fields to return, in model order; None for all, 422 if one is unknown"""
+    if not fields:
+        return None
+    wanted = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = wanted - set(Booking.model_fields)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [f for f in Booking.model_fields if f in wanted]
+
+
+def encode_page_cursor(booking: Booking) -> str:
+    """Opaque keyset cursor positioned just after ``booking``"""
+    return encode_cursor(booking.created_at.isoformat(), booking.id)
+
+
+def decode_page_cursor(cursor: str) -> PageKey:
+    """Page key from a cursor; ``ValueError`` if malformed"""
+    created_at, booking_id = decode_cursor(cursor, str, str)
+    try:
+        return datetime.fromisoformat(created_at), booking_id
+    except ValueError:
+        raise ValueError(MALFORMED)
+
+
+def _json_rows(bookings: List[Booking], fields: Optional[List[str]]) -> List[str]:
+    include = set(fields) if fields else None
+    return [b.model_dump_json(include=include) for b in bookings]
+
+
+@router.get("/bookings", response_model=List[Dict[str, Any]])
+def list_bookings(
+    criteria: Dict[str, Any] = Depends(booking_filters),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,status,date"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables cursor pagination"),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
+):
+    columns = parse_fields(fields)
+    repo = bookings_repository()
+    headers: Dict[str, str] = {}
+    if limit is not None or after is not None:
+        try:
+            after_key = decode_page_cursor(after) if after is not None else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        limit = limit or DEFAULT_PAGE_SIZE
+        # One extra row tells whether another page follows
+        bookings = repo.page(limit + 1, after_key, **criteria)
+        if len(bookings) > limit:
+            bookings = bookings[:limit]
+            headers["X-Next-Cursor"] = encode_page_cursor(bookings[-1])
+    else:
+        bookings = repo.find(**criteria) if criteria else repo.list()
+    # Serialized straight from the stored models rather than re-validated as a response model
+    content = "[" + ",".join(_json_rows(bookings, columns)) + "]"
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 @router.post("/bookings", response_model=Booking)
 def create_booking(payload: BookingCreate) -> Booking:
-    booking_id = f"CF-{int(datetime.utcnow().timestamp())}"
+    try:
+        day = date.fromisoformat(payload.date)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="date must be YYYY-MM-DD")
+    if payload.time_slot not in SLOT_INDEX:
+        raise HTTPException(status_code=422, detail=f"Unknown time slot {payload.time_slot!r}")
+    if get_catalog().position(payload.cleaner_id) is None:
+        raise HTTPException(status_code=404, detail="Cleaner not found")
+    if get_availability_store().day_index(day) is None:
+        raise HTTPException(status_code=422, detail="date is outside the booking horizon")
+    if slot_has_started(day, payload.time_slot):
+        raise HTTPException(status_code=422, detail=f"{payload.time_slot} on {day.isoformat()} has already started")
+    # Check-and-reserve is atomic per cleaner, so concurrent requests cannot double book
+    sync_reservations()
+    try:
+        reserved = reserve_slots(payload.cleaner_id, day, payload.time_slot, payload.duration)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except SlotConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    booking_id = new_id("CF-")
     booking = Booking(
         id=booking_id,
         created_at=datetime.utcnow(),
@@ -48,18 +289,110 @@ def create_booking(payload: BookingCreate) -> Booking:
         customer_name=payload.customer_name.strip(),
         customer_phone=payload.customer_phone.strip(),
         address=payload.address.strip(),
-        date=payload.date,
+        # Stored in one spelling, so equal days compare, filter and claim alike
+        date=day.isoformat(),
         time_slot=payload.time_slot,
+        duration=payload.duration,
         notes=(payload.notes.strip() if payload.notes else None),
     )
-    BOOKINGS[booking_id] = booking
+    # The shared store's slot claims also catch clashes with bookings made by other workers
+    try:
+        bookings_repository().add(booking)
+    except ClaimConflict:
+        # Another worker got there first: take the book back to what the store says
+        sync_reservations(full=True)
+        raise HTTPException(status_code=409, detail=f"{payload.time_slot} on {booking.date} is no longer available")
+    except Exception:
+        # Nothing was stored (e.g. the database was locked), so the slots are free again
+        drop_slots(payload.cleaner_id, day, reserved)
+        raise
+    _note_hold(booking)
     return booking
 
 
+@router.get("/bookings/export")
+def export_bookings(
+    criteria: Dict[str, Any] = Depends(booking_filters),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export"),
+    format_: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+):
+    """Every matching booking, oldest first, streamed from the store a chunk at a time"""
+    columns = parse_fields(fields) or list(Booking.model_fields)
+    repo = bookings_repository()
+
+    def chunks() -> Iterator[List[Booking]]:
+        after = None
+        while True:
+            bookings = repo.page(EXPORT_CHUNK_SIZE, after, **criteria)
+            if not bookings:
+                return
+            yield bookings
+            after = (bookings[-1].created_at, bookings[-1].id)
+
+    def ndjson() -> Iterator[str]:
+        for bookings in chunks():
+            yield "".join(row + "\n" for row in _json_rows(bookings, columns))
+
+    def csv_rows() -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for bookings in chunks():
+            writer.writerows([getattr(b, f) for f in columns] for b in bookings)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    media_type = "text/csv" if format_ == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        csv_rows() if format_ == "csv" else ndjson(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="bookings.{format_}"'},
+    )
+
+
 @router.get("/bookings/{booking_id}", response_model=Booking)
 def get_booking(booking_id: str) -> Booking:
-    if booking_id not in BOOKINGS:
+    booking = bookings_repository().get(booking_id)
+    if booking is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return booking
+
+
+@router.post("/bookings/{booking_id}/status", response_model=Booking)
+def update_booking_status(booking_id: str, payload: BookingStatusUpdate) -> Booking:
+    if payload.status not in STATUS_TRANSITIONS:
+        raise HTTPException(status_code=422, detail=f"Unknown status {payload.status!r}")
+
+    def transition(booking: Booking) -> Booking:
+        if payload.status not in STATUS_TRANSITIONS[booking.status]:
+            raise HTTPException(status_code=409, detail=f"A {booking.status} booking cannot become {payload.status}")
+        return booking.model_copy(update={"status": payload.status})
+
+    # Checked and applied atomically in the store, so racing transitions cannot both win
+    updated = bookings_repository().update(booking_id, transition)
+    if updated is None:
         raise HTTPException(status_code=404, detail="Booking not found")
-    return BOOKINGS[booking_id]
+    # Finished or cancelled bookings give their slots back; other workers see it on their next sync
+    sync_reservations()
+    return updated
 
 
+@router.post("/bookings/{booking_id}/rating", response_model=Booking)
+def rate_booking(booking_id: str, payload: BookingRating) -> Booking:
+    comment = payload.comment.strip() if payload.comment else None
+
+    def rate(booking: Booking) -> Booking:
+        if booking.status != "completed":
+            raise HTTPException(status_code=409, detail="Only completed bookings can be rated")
+        if booking.rating is not None:
+            raise HTTPException(status_code=409, detail="Booking has already been rated")
+        return booking.model_copy(update={"rating": payload.rating, "review": comment})
+
+    updated = bookings_repository().update(booking_id, rate)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    # Folded in from the store like other workers' ratings, so it counts once everywhere
+    sync_reservations()
+    return updated
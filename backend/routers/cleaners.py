@@ -1,39 +1,155 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 from typing import List, Dict, Any, Optional
+from datetime import date
 
-from data.cleaners_data import CLEANERS_DATA, get_cleaners_dataframe, get_cleaner_reviews
+from data.availability import HORIZON_DAYS
+from data.catalog import get_catalog
+from data.cleaner_query import CleanerQuery, find_cleaners
+from data.facets import cleaner_facets
+from data.similarity import MAX_NEIGHBOURS, similar_cleaners, similarity_version
+from data.cleaners_data import get_cleaner_reviews, get_reviews_version
+
+from .bookings import sync_reservations
+from ..http_cache import cache_headers, digest, make_etag, not_modified, query_digest
 
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+MAX_AVAILABILITY_DAYS = HORIZON_DAYS
 
-@router.get("/cleaners", response_model=List[Dict[str, Any]])
-def list_cleaners(
-    q: Optional[str] = Query(None, description="Free text search by name or skills"),
+
+def parse_ids(ids: str) -> List[int]:
+    """Comma-separated cleaner ids from a query parameter; 422 if malformed"""
+    try:
+        return [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be comma-separated integers")
+
+
+def cleaner_filters(
+    q: Optional[str] = Query(None, description="Free text search by name, bio or skills"),
     min_rating: Optional[float] = Query(None, ge=0, le=5),
+    min_rate: Optional[float] = Query(None, ge=0),
     max_rate: Optional[float] = Query(None, gt=0),
+    min_experience: Optional[int] = Query(None, ge=0),
+    skills: Optional[str] = Query(None, description="Comma-separated skill names"),
+    skill_match: str = Query("any", pattern="^(any|all)$", description="Require any or all of the skills"),
+    available_on: Optional[date] = Query(None, description="Only cleaners with an open slot on this date"),
+    available_from: Optional[date] = Query(None, description="Only cleaners with an open slot in [from, to]"),
+    available_to: Optional[date] = Query(None),
+) -> CleanerQuery:
+    if available_on is not None:
+        if available_from is not None or available_to is not None:
+            raise HTTPException(status_code=422, detail="Use either available_on or available_from/available_to")
+        available_from = available_to = available_on
+    if (available_from is None) != (available_to is None):
+        raise HTTPException(status_code=422, detail="available_from and available_to must be given together")
+    if available_from is not None:
+        if available_to < available_from:
+            raise HTTPException(status_code=422, detail="available_to must not be before available_from")
+        if (available_to - available_from).days >= MAX_AVAILABILITY_DAYS:
+            raise HTTPException(status_code=422, detail=f"Availability range is limited to {MAX_AVAILABILITY_DAYS} days")
+    # Open slots and ratings depend on bookings other workers may have taken or rated
+    sync_reservations()
+    return CleanerQuery.build(
+        q=q,
+        min_rating=min_rating,
+        min_rate=min_rate,
+        max_rate=max_rate,
+        min_experience=min_experience,
+        skills=[s.strip() for s in skills.split(",") if s.strip()] if skills else (),
+        match_all_skills=(skill_match == "all"),
+        available_from=available_from,
+        available_to=available_to,
+    )
+
+
+@router.get("/cleaners", response_model=List[Dict[str, Any]])
+def list_cleaners(
+    request: Request,
+    filters: CleanerQuery = Depends(cleaner_filters),
+    ids: Optional[str] = Query(None, description="Comma-separated cleaner ids to fetch in one call"),
+    sort: Optional[str] = Query(None, pattern="^(relevance|rating|price|experience|reviews)$"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; enables keyset pagination"),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
 ):
-    df = get_cleaners_dataframe()
-    if q:
-        q_lower = q.lower()
-        df = df[df.apply(lambda r: q_lower in r["name"].lower() or any(q_lower in s.lower() for s in r["skills"]), axis=1)]
-    if min_rating is not None:
-        df = df[df["rating"] >= min_rating]
-    if max_rate is not None:
-        df = df[df["hourly_rate"] <= max_rate]
-    return df.to_dict(orient="records")
+    catalog = get_catalog()
+    etag = make_etag("c", *filters.cache_key(catalog), query_digest(request))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    query = filters._replace(sort=sort)
+    headers = cache_headers(etag)
+    if ids:
+        positions = catalog.positions(parse_ids(ids))
+        positions = positions[query.mask(catalog)[positions]]
+        if sort:
+            positions = catalog.sort_positions(positions, sort)
+    else:
+        positions = find_cleaners(query, catalog)
+        if limit is not None or after is not None:
+            try:
+                positions, next_cursor = catalog.page(positions, sort, limit or DEFAULT_PAGE_SIZE, after)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if next_cursor:
+                headers["X-Next-Cursor"] = next_cursor
+    # Cached per-cleaner JSON is concatenated as-is, skipping validation and re-encoding
+    return Response(content=catalog.json_rows(positions), media_type="application/json", headers=headers)
+
+
+@router.get("/cleaners/facets", response_model=Dict[str, Any])
+def get_cleaner_facets(request: Request, filters: CleanerQuery = Depends(cleaner_filters)):
+    catalog = get_catalog()
+    etag = make_etag("f", *filters.cache_key(catalog), query_digest(request))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    return JSONResponse(cleaner_facets(filters, catalog), headers=cache_headers(etag))
 
 
 @router.get("/cleaners/{cleaner_id}", response_model=Dict[str, Any])
-def get_cleaner(cleaner_id: int):
-    for c in CLEANERS_DATA:
-        if c["id"] == cleaner_id:
-            return c
-    raise HTTPException(status_code=404, detail="Cleaner not found")
+def get_cleaner(request: Request, cleaner_id: int):
+    sync_reservations()
+    catalog = get_catalog()
+    pos = catalog.position(cleaner_id)
+    if pos is None:
+        raise HTTPException(status_code=404, detail="Cleaner not found")
+    body = catalog.json_row(pos)
+    # Keyed on the record's own bytes so unrelated catalog changes keep it valid
+    etag = make_etag("d", digest(body.decode("utf-8")))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag))
 
 
 @router.get("/cleaners/{cleaner_id}/reviews", response_model=List[Dict[str, Any]])
-def list_reviews(cleaner_id: int):
-    return get_cleaner_reviews(cleaner_id)
+def list_reviews(request: Request, cleaner_id: int):
+    sync_reservations()
+    etag = make_etag("r", cleaner_id, get_reviews_version(cleaner_id))
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    return JSONResponse(get_cleaner_reviews(cleaner_id), headers=cache_headers(etag))
 
 
+@router.get("/cleaners/{cleaner_id}/similar", response_model=List[Dict[str, Any]])
+def list_similar(
+    request: Request,
+    cleaner_id: int,
+    limit: int = Query(5, ge=1, le=MAX_NEIGHBOURS),
+):
+    catalog = get_catalog()
+    if catalog.position(cleaner_id) is None:
+        raise HTTPException(status_code=404, detail="Cleaner not found")
+    # Neighbours may lag the catalog while they are recomputed, so the tag names both versions
+    etag = make_etag("s", catalog.version, similarity_version(catalog), cleaner_id, limit)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    positions, _ = similar_cleaners(cleaner_id, limit, catalog)
+    return Response(content=catalog.json_rows(positions), media_type="application/json", headers=cache_headers(etag))
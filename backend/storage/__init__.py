@@ -0,0 +1,90 @@
+"""Durable storage for bookings and applications.
+
+``CLEANFEE_STORAGE`` picks the engine:
+
+- ``sqlite`` (default) keeps records in the SQLite file at ``CLEANFEE_DB_PATH``
+  (default ``cleanfee.db``), which several API workers on one machine can share;
+- ``eventlog`` keeps them in memory, appending every change to an event log
+  under ``CLEANFEE_EVENTLOG_DIR`` (default ``cleanfee-events``) and snapshotting
+  every ``CLEANFEE_SNAPSHOT_EVERY`` events; one process owns the directory;
+- ``memory`` keeps them in the process and forgets them on restart.
+"""
+import os
+import threading
+from typing import Dict, Optional, Sequence, Type
+
+from .base import ClaimConflict, Claims, ModelT, PageKey, Repository
+from .eventlog import EventLog, EventLogRepository
+from .memory import MemoryRepository
+from .sqlite import SQLiteDatabase, SQLiteRepository
+
+
+STORAGE_ENV = "CLEANFEE_STORAGE"
+DB_PATH_ENV = "CLEANFEE_DB_PATH"
+DEFAULT_DB_PATH = "cleanfee.db"
+EVENTLOG_DIR_ENV = "CLEANFEE_EVENTLOG_DIR"
+DEFAULT_EVENTLOG_DIR = "cleanfee-events"
+SNAPSHOT_EVERY_ENV = "CLEANFEE_SNAPSHOT_EVERY"
+
+_DATABASE: Optional[SQLiteDatabase] = None
+_REPOSITORIES: Dict[str, Repository] = {}
+_LOCK = threading.Lock()
+
+
+def get_repository(
+    name: str, model: Type[ModelT], claims: Optional[Claims] = None, indexes: Sequence[str] = ()
+) -> Repository[ModelT]:
+    """The process-wide repository called ``name``, created on first use"""
+    global _DATABASE
+    repo = _REPOSITORIES.get(name)
+    if repo is not None:
+        return repo
+    with _LOCK:
+        repo = _REPOSITORIES.get(name)
+        if repo is None:
+            engine = os.getenv(STORAGE_ENV, "sqlite")
+            if engine == "memory":
+                repo = MemoryRepository(model, claims, indexes)
+            elif engine == "sqlite":
+                if _DATABASE is None:
+                    _DATABASE = SQLiteDatabase(os.getenv(DB_PATH_ENV, DEFAULT_DB_PATH))
+                repo = SQLiteRepository(_DATABASE, name, model, claims, indexes)
+            elif engine == "eventlog":
+                repo = EventLogRepository(
+                    os.getenv(EVENTLOG_DIR_ENV, DEFAULT_EVENTLOG_DIR),
+                    name,
+                    model,
+                    claims,
+                    indexes,
+                    snapshot_every=int(os.getenv(SNAPSHOT_EVERY_ENV, "10000")),
+                )
+            else:
+                raise ValueError(f"{STORAGE_ENV} must be 'sqlite', 'eventlog' or 'memory', not {engine!r}")
+            _REPOSITORIES[name] = repo
+    return repo
+
+
+def reset_storage() -> None:
+    """Close every repository so the next use reopens them from the environment"""
+    global _DATABASE
+    with _LOCK:
+        for repo in _REPOSITORIES.values():
+            repo.close()
+        _REPOSITORIES.clear()
+        if _DATABASE is not None:
+            _DATABASE.close()
+            _DATABASE = None
+
+
+__all__ = [
+    "ClaimConflict",
+    "EventLog",
+    "EventLogRepository",
+    "MemoryRepository",
+    "PageKey",
+    "Repository",
+    "SQLiteDatabase",
+    "SQLiteRepository",
+    "get_repository",
+    "reset_storage",
+]
@@ -0,0 +1,83 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Keys a record holds exclusively while stored, e.g. (cleaner, date, slot) for a booking
+Claims = Callable[[ModelT], Iterable[Tuple]]
+# Turns a stored record into its next version; may raise to refuse the change
+Change = Callable[[ModelT], ModelT]
+# Position in the (created_at, id) order pages are served in
+PageKey = Tuple[datetime, str]
+# Changes remembered for changes_since; a caller further behind reloads everything
+MAX_CHANGES = 100_000
+
+
+class ClaimConflict(Exception):
+    """Another stored record already holds one of this record's claims"""
+
+
+def claim_key(claim: Tuple) -> str:
+    return "|".join(str(part) for part in claim)
+
+
+class Repository(ABC, Generic[ModelT]):
+    """Storage for one kind of record, keyed by its ``id``"""
+
+    @abstractmethod
+    def add(self, item: ModelT) -> ModelT:
+        """Store a new record; ``ClaimConflict`` if one of its claims is taken"""
+
+    @abstractmethod
+    def get(self, item_id: str) -> Optional[ModelT]:
+        ...
+
+    @abstractmethod
+    def update(self, item_id: str, change: Change) -> Optional[ModelT]:
+        """Atomically replace a record with ``change(record)``; None if there is no such record
+
+        The record's claims are recomputed; ``ClaimConflict`` if a new one is taken.
+        """
+
+    @abstractmethod
+    def list(self) -> List[ModelT]:
+        """Every record, in insertion order"""
+
+    @abstractmethod
+    def find(self, **criteria: Any) -> List[ModelT]:
+        """Records whose fields equal every ``field=value`` given, in insertion order
+
+        Only fields the repository was created with ``indexes`` for can be used;
+        ``ValueError`` otherwise.
+        """
+
+    @abstractmethod
+    def page(self, limit: int, after: Optional[PageKey] = None, **criteria: Any) -> List[ModelT]:
+        """Up to ``limit`` records ordered by ``(created_at, id)``, starting after ``after``
+
+        ``criteria`` filter like ``find``.
+        """
+
+    @abstractmethod
+    def changes_since(self, revision: Optional[int]) -> Tuple[int, Optional[List[ModelT]]]:
+        """The store's current revision and the records added or updated after ``revision``
+
+        The list is None when the caller must reload everything instead: no
+        revision given, the records were replaced wholesale since, or more than
+        ``MAX_CHANGES`` changes ago.
+        """
+
+    @abstractmethod
+    def replace_all(self, items: Iterable[ModelT]) -> None:
+        """Swap in a whole new set of records; later records lose claim conflicts"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def close(self) -> None:
+        pass
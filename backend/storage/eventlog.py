@@ -0,0 +1,333 @@
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import zlib
+from concurrent.futures import Future
+from typing import Any, Dict, Generic, Iterable, Iterator, List, Optional, Sequence, Tuple, Type
+
+from .base import Change, ClaimConflict, Claims, ModelT
+from .memory import MemoryRepository
+
+
+logger = logging.getLogger(__name__)
+
+# Every record is its payload length and CRC-32, then the JSON payload
+_HEADER = struct.Struct(">II")
+# Appends flushed and fsynced together at most
+MAX_BATCH = 1024
+_ROTATE = object()
+
+
+def _fsync_dir(directory: str) -> None:
+    # New and renamed files survive a crash only once their directory entry is synced
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class EventLog:
+    """Append-only, length-prefixed records in numbered segment files, fsynced in groups
+
+    A writer thread takes every append queued while its previous fsync ran,
+    writes them in one go and fsyncs once, so concurrent appenders share the
+    cost of a flush. ``rotate`` starts a new segment, after which older
+    segments can be dropped once a snapshot covers them.
+    """
+
+    def __init__(self, directory: str, name: str, fsync: bool = True):
+        self.directory = directory
+        self.name = name
+        self.fsync = fsync
+        self._queue: "queue.Queue[Optional[Tuple[Any, Future]]]" = queue.Queue()
+        self._file = None
+        self._segment = 0
+        self._thread: Optional[threading.Thread] = None
+        # Flushes that failed so far; a snapshot taken across one may hold changes never logged
+        self.failures = 0
+
+    def segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{self.name}.{segment:08d}.log")
+
+    def segments(self) -> List[int]:
+        prefix, suffix = f"{self.name}.", ".log"
+        found = []
+        for entry in os.listdir(self.directory):
+            number = entry[len(prefix):-len(suffix)]
+            if entry.startswith(prefix) and entry.endswith(suffix) and number.isdigit():
+                found.append(int(number))
+        return sorted(found)
+
+    def replay(self, first_segment: int) -> Iterator[Dict[str, Any]]:
+        """Records from ``first_segment`` on, cutting off a torn or corrupt tail"""
+        for segment in self.segments():
+            if segment < first_segment:
+                continue
+            path = self.segment_path(segment)
+            with open(path, "rb") as f:
+                data = f.read()
+            offset = 0
+            while offset + _HEADER.size <= len(data):
+                length, crc = _HEADER.unpack_from(data, offset)
+                payload = data[offset + _HEADER.size:offset + _HEADER.size + length]
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                yield json.loads(payload)
+                offset += _HEADER.size + length
+            if offset < len(data):
+                # A crash mid-append leaves a partial record; nothing after it was acknowledged
+                logger.warning("Truncating %d bytes of torn records from %s", len(data) - offset, path)
+                with open(path, "r+b") as f:
+                    f.truncate(offset)
+
+    def open(self, segment: int) -> None:
+        """Start appending to ``segment``"""
+        self._segment = segment
+        self._file = open(self.segment_path(segment), "ab", buffering=0)
+        _fsync_dir(self.directory)
+        self._thread = threading.Thread(target=self._write_loop, name=f"{self.name}-log", daemon=True)
+        self._thread.start()
+
+    def append(self, record: Dict[str, Any]) -> Future:
+        """Queue a record; the future resolves once it is on disk"""
+        payload = json.dumps(record, separators=(",", ":")).encode()
+        future: Future = Future()
+        self._queue.put((_HEADER.pack(len(payload), zlib.crc32(payload)) + payload, future))
+        return future
+
+    def rotate(self) -> Future:
+        """Queue a switch to a new segment; the future resolves to its number"""
+        future: Future = Future()
+        self._queue.put((_ROTATE, future))
+        return future
+
+    def drop_before(self, segment: int) -> None:
+        for old in self.segments():
+            if old < segment:
+                os.remove(self.segment_path(old))
+
+    def _flush(self, pending: List[Tuple[bytes, Future]]) -> None:
+        if not pending:
+            return
+        # Not tell(): an append-mode file reports 0 until its first write
+        offset = os.fstat(self._file.fileno()).st_size
+        try:
+            # Unbuffered, so a failed write leaves nothing behind to be written later
+            data = memoryview(b"".join(record for record, _ in pending))
+            while data:
+                data = data[self._file.write(data):]
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        except Exception as e:
+            self.failures += 1
+            # Cut off whatever part of the batch landed, so later appends are not stranded behind it
+            try:
+                self._file.truncate(offset)
+            except Exception:
+                logger.exception("Could not truncate %s after a failed append", self.segment_path(self._segment))
+            for _, future in pending:
+                future.set_exception(e)
+        else:
+            for _, future in pending:
+                future.set_result(None)
+        pending.clear()
+
+    def _write_loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            while len(batch) < MAX_BATCH:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            pending: List[Tuple[bytes, Future]] = []
+            for record, future in batch:
+                if record is not _ROTATE:
+                    pending.append((record, future))
+                    continue
+                self._flush(pending)
+                try:
+                    self._file.close()
+                    self._segment += 1
+                    self._file = open(self.segment_path(self._segment), "ab", buffering=0)
+                    _fsync_dir(self.directory)
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(self._segment)
+            self._flush(pending)
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class EventLogRepository(MemoryRepository[ModelT], Generic[ModelT]):
+    """Records held in memory and made durable by an event log with periodic snapshots
+
+    Each change is appended to the log as an event. Every ``snapshot_every``
+    events the state is written out as a snapshot in the background and the
+    segments it covers are dropped, so startup loads the latest snapshot and
+    replays only the events after it. The log has a single writer: one process
+    owns the directory.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        name: str,
+        model: Type[ModelT],
+        claims: Optional[Claims] = None,
+        indexes: Sequence[str] = (),
+        snapshot_every: int = 10_000,
+        fsync: bool = True,
+    ):
+        super().__init__(model, claims, indexes)
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_every = snapshot_every
+        self._snapshot_path = os.path.join(directory, f"{name}.snapshot.json")
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_segment = -1
+        self._snapshotting = False
+
+        self.log = EventLog(directory, name, fsync=fsync)
+        first_segment = self._load_snapshot()
+        self._since_snapshot = 0
+        for event in self.log.replay(first_segment):
+            self._apply(event)
+            self._since_snapshot += 1
+        # Claims and indexes once at the end rather than per replayed event
+        self._rebuild(list(self._items.values()))
+        self.log.open(max(self.log.segments() + [first_segment]))
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        if event["op"] == "add":
+            item = self.model.model_validate(event["item"])
+            self._items[item.id] = item
+        elif event["op"] == "update":
+            current = self._items[event["id"]]
+            self._items[event["id"]] = self.model.model_validate({**current.model_dump(mode="json"), **event["changes"]})
+
+    def _load_snapshot(self) -> int:
+        """Load the latest snapshot; returns the first log segment it does not cover"""
+        if not os.path.exists(self._snapshot_path):
+            return 0
+        with open(self._snapshot_path) as f:
+            snapshot = json.load(f)
+        self._items = {item["id"]: self.model.model_validate(item) for item in snapshot["items"]}
+        self._snapshot_segment = snapshot["segment"]
+        return snapshot["segment"]
+
+    def _save_snapshot(self, items: List[ModelT], segment: int) -> None:
+        with self._snapshot_lock:
+            # A slower background snapshot must not overwrite a newer one
+            if segment <= self._snapshot_segment:
+                return
+            tmp = self._snapshot_path + ".tmp"
+            with open(tmp, "w") as f:
+                f.write(f'{{"segment":{segment},"items":[')
+                f.write(",".join(item.model_dump_json() for item in items))
+                f.write("]}")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._snapshot_path)
+            _fsync_dir(self.log.directory)
+            self._snapshot_segment = segment
+            self.log.drop_before(segment)
+
+    def _snapshot_in_background(self, items: List[ModelT], rotated: Future, failures: int) -> None:
+        try:
+            segment = rotated.result()
+            if self.log.failures != failures:
+                # An append before the rotation failed and is being rolled back; the items may include it
+                logger.warning("Skipping a snapshot of %s taken across a failed append", self.log.name)
+                return
+            self._save_snapshot(items, segment)
+        except Exception:
+            logger.exception("Snapshot of %s failed; the log still has every event", self.log.name)
+        finally:
+            self._snapshotting = False
+
+    def _append(self, event: Dict[str, Any]) -> Future:
+        # Called under self._lock, so log order matches the order changes were applied
+        written = self.log.append(event)
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every and not self._snapshotting:
+            self._snapshotting = True
+            self._since_snapshot = 0
+            # Events queued after the rotation land in the new segment, outside the snapshot
+            items, rotated = list(self._items.values()), self.log.rotate()
+            args = (items, rotated, self.log.failures)
+            threading.Thread(target=self._snapshot_in_background, args=args, daemon=True).start()
+        return written
+
+    def add(self, item: ModelT) -> ModelT:
+        # Applied before the append so claims are checked and taken in log order;
+        # undone if the append fails, so nothing not on disk stays readable
+        with self._lock:
+            self._insert(item)
+            written = self._append({"op": "add", "item": item.model_dump(mode="json")})
+        try:
+            written.result()
+        except Exception:
+            with self._lock:
+                if self._items.get(item.id) is item:
+                    self._remove(item)
+                self._forget_changes()
+            raise
+        return item
+
+    def update(self, item_id: str, change: Change) -> Optional[ModelT]:
+        with self._lock:
+            current = self._items.get(item_id)
+            if current is None:
+                return None
+            updated = change(current)
+            self._replace(current, updated)
+            # Only the fields that changed go in the event
+            before, after = current.model_dump(mode="json"), updated.model_dump(mode="json")
+            changes = {field: value for field, value in after.items() if before.get(field) != value}
+            written = self._append({"op": "update", "id": item_id, "changes": changes}) if changes else None
+        if written is not None:
+            try:
+                written.result()
+            except Exception:
+                with self._lock:
+                    # Unless a later change already replaced it (and is failing with this one)
+                    if self._items.get(item_id) is updated:
+                        try:
+                            self._replace(updated, current)
+                        except ClaimConflict:
+                            logger.error("Could not roll back %s: its old claims were taken since", item_id)
+                    self._forget_changes()
+                raise
+        return updated
+
+    def replace_all(self, items: Iterable[ModelT]) -> None:
+        items = list(items)
+        with self._lock:
+            self._rebuild(items)
+            self._since_snapshot = 0
+            # A bulk load goes straight to a snapshot rather than through the log
+            self._save_snapshot(list(self._items.values()), self.log.rotate().result())
+
+    def close(self) -> None:
+        self.log.close()
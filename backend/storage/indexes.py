@@ -0,0 +1,101 @@
+import bisect
+import itertools
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+
+class SecondaryIndexes:
+    """Per-field maps from value to the ids of records holding it, in insertion order
+
+    Lookups start from the smallest matching posting list and check it against
+    the others, so a query costs about the size of its most selective field's
+    match rather than a scan of every record. Given an ``order`` key (ending
+    with the record's id), each posting also keeps its records' keys sorted, so
+    a page of matches after a key is read without sorting them all. Not
+    thread-safe; the owning repository serializes changes.
+    """
+
+    def __init__(self, fields: Sequence[str], order: Optional[Callable[[BaseModel], Tuple]] = None):
+        self.fields = tuple(fields)
+        self._order = order
+        self._postings: Dict[str, Dict[Any, Dict[str, int]]] = {field: {} for field in self.fields}
+        self._ordered: Dict[str, Dict[Any, List[Tuple]]] = {field: {} for field in self.fields}
+        self._seq: Dict[str, int] = {}
+        self._counter = itertools.count()
+
+    def _add_postings(self, item: BaseModel) -> None:
+        seq = self._seq.setdefault(item.id, next(self._counter))
+        for field in self.fields:
+            self._postings[field].setdefault(getattr(item, field), {})[item.id] = seq
+
+    def add(self, item: BaseModel) -> None:
+        self._add_postings(item)
+        if self._order is not None:
+            key = self._order(item)
+            for field in self.fields:
+                bisect.insort(self._ordered[field].setdefault(getattr(item, field), []), key)
+
+    def remove(self, item: BaseModel) -> None:
+        """Unindex a record's current values; its insertion position is kept for a re-add"""
+        for field in self.fields:
+            value = getattr(item, field)
+            posting = self._postings[field].get(value)
+            if posting is not None:
+                posting.pop(item.id, None)
+                if not posting:
+                    del self._postings[field][value]
+            ordered = self._ordered[field].get(value)
+            if ordered is not None:
+                key = self._order(item)
+                at = bisect.bisect_left(ordered, key)
+                if at < len(ordered) and ordered[at] == key:
+                    del ordered[at]
+                if not ordered:
+                    del self._ordered[field][value]
+
+    def clear(self) -> None:
+        self._postings = {field: {} for field in self.fields}
+        self._ordered = {field: {} for field in self.fields}
+        self._seq = {}
+
+    def rebuild(self, items: Iterable[BaseModel]) -> None:
+        """Index ``items`` from scratch, sorting each posting once rather than per record"""
+        self.clear()
+        for item in items:
+            self._add_postings(item)
+            if self._order is not None:
+                key = self._order(item)
+                for field in self.fields:
+                    self._ordered[field].setdefault(getattr(item, field), []).append(key)
+        for postings in self._ordered.values():
+            for ordered in postings.values():
+                ordered.sort()
+
+    def _check(self, criteria: Mapping[str, Any]) -> None:
+        unknown = set(criteria) - set(self.fields)
+        if unknown:
+            raise ValueError(f"Not indexed: {', '.join(sorted(unknown))}")
+
+    def lookup(self, criteria: Mapping[str, Any]) -> List[str]:
+        """Ids of records matching every ``field=value``, oldest first"""
+        self._check(criteria)
+        postings = sorted((self._postings[field].get(value, {}) for field, value in criteria.items()), key=len)
+        smallest, rest = postings[0], postings[1:]
+        matches = [(seq, item_id) for item_id, seq in smallest.items() if all(item_id in p for p in rest)]
+        return [item_id for _, item_id in sorted(matches)]
+
+    def page(self, criteria: Mapping[str, Any], after: Optional[Tuple], limit: int) -> List[str]:
+        """Ids of the first ``limit`` records matching every ``field=value`` whose order key follows ``after``"""
+        self._check(criteria)
+        field, value = min(criteria.items(), key=lambda fv: len(self._postings[fv[0]].get(fv[1], {})))
+        ordered = self._ordered[field].get(value, [])
+        rest = [self._postings[f].get(v, {}) for f, v in criteria.items() if f != field]
+        ids: List[str] = []
+        at = bisect.bisect_right(ordered, after) if after is not None else 0
+        while at < len(ordered) and len(ids) < limit:
+            item_id = ordered[at][-1]
+            if all(item_id in p for p in rest):
+                ids.append(item_id)
+            at += 1
+        return ids
@@ -0,0 +1,138 @@
+import bisect
+import threading
+from typing import Any, Dict, Generic, Iterable, List, Optional, Sequence, Tuple, Type
+
+from .base import MAX_CHANGES, Change, ClaimConflict, Claims, ModelT, PageKey, Repository, claim_key
+from .indexes import SecondaryIndexes
+
+
+class MemoryRepository(Repository[ModelT], Generic[ModelT]):
+    """Process-local repository; contents are lost on restart"""
+
+    def __init__(self, model: Type[ModelT], claims: Optional[Claims] = None, indexes: Sequence[str] = ()):
+        self.model = model
+        self._claims_of = claims
+        self._items: Dict[str, ModelT] = {}
+        self._claims: Dict[str, str] = {}
+        self._indexes = SecondaryIndexes(indexes, order=self._page_key)
+        # Every record's page key, kept sorted for keyset pages
+        self._order: List[PageKey] = []
+        # Ids in the order they changed; revision = _reset_at + len(_changes)
+        self._changes: List[str] = []
+        self._reset_at = 0
+        self._lock = threading.Lock()
+
+    def _keys(self, item: ModelT) -> List[str]:
+        return [claim_key(c) for c in self._claims_of(item)] if self._claims_of else []
+
+    @staticmethod
+    def _page_key(item: ModelT) -> PageKey:
+        return item.created_at, item.id
+
+    def _insert(self, item: ModelT) -> None:
+        """Store a new record with its claims and index entries; the caller holds the lock"""
+        keys = self._keys(item)
+        if item.id in self._items or any(key in self._claims for key in keys):
+            raise ClaimConflict(item.id)
+        self._items[item.id] = item
+        self._claims.update((key, item.id) for key in keys)
+        self._indexes.add(item)
+        bisect.insort(self._order, self._page_key(item))
+        self._log_change(item.id)
+
+    def _replace(self, current: ModelT, updated: ModelT) -> None:
+        """Swap a record for its next version; the caller holds the lock"""
+        new_keys = self._keys(updated)
+        if any(self._claims.get(key, current.id) != current.id for key in new_keys):
+            raise ClaimConflict(current.id)
+        for key in self._keys(current):
+            self._claims.pop(key, None)
+        self._claims.update((key, current.id) for key in new_keys)
+        self._indexes.remove(current)
+        self._indexes.add(updated)
+        if self._page_key(updated) != self._page_key(current):
+            del self._order[bisect.bisect_left(self._order, self._page_key(current))]
+            bisect.insort(self._order, self._page_key(updated))
+        self._items[current.id] = updated
+        self._log_change(current.id)
+
+    def _remove(self, item: ModelT) -> None:
+        """Drop a stored record with its claims and index entries; the caller holds the lock"""
+        del self._items[item.id]
+        for key in self._keys(item):
+            if self._claims.get(key) == item.id:
+                del self._claims[key]
+        self._indexes.remove(item)
+        del self._order[bisect.bisect_left(self._order, self._page_key(item))]
+
+    def _forget_changes(self) -> None:
+        # Callers of changes_since reload everything, e.g. after records vanished
+        self._reset_at += len(self._changes) + 1
+        self._changes = []
+
+    def _log_change(self, item_id: str) -> None:
+        self._changes.append(item_id)
+        if len(self._changes) >= 2 * MAX_CHANGES:
+            # Forget the older half; the revision stays the same
+            self._reset_at += MAX_CHANGES
+            del self._changes[:MAX_CHANGES]
+
+    def _rebuild(self, items: Iterable[ModelT]) -> None:
+        """Replace every record, claim and index entry; the caller holds the lock"""
+        stored: Dict[str, ModelT] = {}
+        claims: Dict[str, str] = {}
+        for item in items:
+            stored[item.id] = item
+            for key in self._keys(item):
+                claims.setdefault(key, item.id)
+        self._indexes.rebuild(stored.values())
+        self._items, self._claims = stored, claims
+        self._order = sorted(self._page_key(item) for item in stored.values())
+        self._forget_changes()
+
+    def add(self, item: ModelT) -> ModelT:
+        with self._lock:
+            self._insert(item)
+        return item
+
+    def get(self, item_id: str) -> Optional[ModelT]:
+        return self._items.get(item_id)
+
+    def update(self, item_id: str, change: Change) -> Optional[ModelT]:
+        with self._lock:
+            current = self._items.get(item_id)
+            if current is None:
+                return None
+            updated = change(current)
+            self._replace(current, updated)
+        return updated
+
+    def list(self) -> List[ModelT]:
+        return list(self._items.values())
+
+    def find(self, **criteria: Any) -> List[ModelT]:
+        with self._lock:
+            return [self._items[item_id] for item_id in self._indexes.lookup(criteria)]
+
+    def page(self, limit: int, after: Optional[PageKey] = None, **criteria: Any) -> List[ModelT]:
+        with self._lock:
+            if criteria:
+                return [self._items[item_id] for item_id in self._indexes.page(criteria, after, limit)]
+            start = bisect.bisect_right(self._order, after) if after is not None else 0
+            return [self._items[item_id] for _, item_id in self._order[start:start + limit]]
+
+    def changes_since(self, revision: Optional[int]) -> Tuple[int, Optional[List[ModelT]]]:
+        with self._lock:
+            current = self._reset_at + len(self._changes)
+            if revision is None or not self._reset_at <= revision <= current:
+                return current, None
+            changed = dict.fromkeys(self._changes[revision - self._reset_at:])
+            return current, [self._items[item_id] for item_id in changed]
+
+    def replace_all(self, items: Iterable[ModelT]) -> None:
+        items = list(items)
+        with self._lock:
+            self._rebuild(items)
+
+    def __len__(self) -> int:
+        return len(self._items)
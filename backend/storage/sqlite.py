@@ -0,0 +1,346 @@
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from pydantic import TypeAdapter
+
+from .base import MAX_CHANGES, Change, ClaimConflict, Claims, ModelT, PageKey, Repository, claim_key
+
+
+T = TypeVar("T")
+
+# Serializes cursor timestamps exactly as pydantic stored them in the JSON
+_DATETIME = TypeAdapter(datetime)
+
+# Writes applied per transaction at most; a batch is whatever is queued when the writer is free
+MAX_BATCH = 512
+# Rows ANALYZE samples per index, keeping a statistics refresh cheap on large tables
+ANALYSIS_LIMIT = 1000
+# Planner statistics are refreshed once the rows added reach this or the row count at the last refresh
+ANALYZE_MIN_ROWS = 1000
+
+
+class SQLiteDatabase:
+    """One SQLite file in WAL mode: pooled reader connections and a group-committing writer
+
+    Readers never wait for writers under WAL. All of this process's writes go
+    through one writer thread that applies every queued write in a single
+    transaction (each under its own savepoint, so one failing write does not
+    undo the others) and commits once, amortizing the fsync across the batch.
+    Other processes sharing the file take turns through SQLite's own write lock.
+    """
+
+    def __init__(self, path: str, pool_size: int = 8, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._reader_slots = threading.Semaphore(pool_size)
+        self._writes: "queue.Queue[Optional[Tuple[Callable, Future]]]" = queue.Queue()
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+        self._thread = threading.Thread(target=self._write_loop, name="sqlite-writer", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: transactions are opened explicitly; the statement cache
+        # keeps the repositories' fixed SQL prepared per connection
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """A pooled read connection, returned to the pool afterwards"""
+        with self._reader_slots:
+            try:
+                conn = self._readers.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            finally:
+                self._readers.put(conn)
+
+    def write(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run ``fn`` in the next group commit and return its result once durable"""
+        future: Future = Future()
+        self._writes.put((fn, future))
+        return future.result()
+
+    def _write_loop(self) -> None:
+        conn = self._writer
+        while True:
+            first = self._writes.get()
+            if first is None:
+                return
+            batch = [first]
+            while len(batch) < MAX_BATCH:
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._writes.put(None)
+                    break
+                batch.append(item)
+
+            outcomes = []
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for fn, future in batch:
+                    conn.execute("SAVEPOINT write")
+                    try:
+                        outcomes.append((future, fn(conn), None))
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO write")
+                        outcomes.append((future, None, e))
+                    conn.execute("RELEASE write")
+                conn.execute("COMMIT")
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for future, result, error in outcomes:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+    def close(self) -> None:
+        self._writes.put(None)
+        self._thread.join()
+        self._writer.close()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+
+
+class SQLiteRepository(Repository[ModelT], Generic[ModelT]):
+    """Records stored as JSON in one table, with claims in a uniquely keyed side table
+
+    Indexed fields get an index on their JSON expression, so ``find`` is an
+    index lookup without a separate column per field. The table is re-analyzed
+    as it grows so that, given several indexed fields, SQLite picks the most
+    selective index.
+    """
+
+    def __init__(
+        self,
+        db: SQLiteDatabase,
+        table: str,
+        model: Type[ModelT],
+        claims: Optional[Claims] = None,
+        indexes: Sequence[str] = (),
+    ):
+        self.db = db
+        self.table = table
+        self.model = model
+        self.indexes = tuple(indexes)
+        self._claims_of = claims
+        self._analyzed_rows = 0
+        self._rows_since_analyze = 0
+        self._insert = f"INSERT INTO {table} (id, data) VALUES (?, ?)"
+        self._insert_claim = f"INSERT INTO {table}_claims (claim, id) VALUES (?, ?)"
+        self._select_one = f"SELECT data FROM {table} WHERE id = ?"
+        self._update = f"UPDATE {table} SET data = ? WHERE id = ?"
+        self._delete_claims = f"DELETE FROM {table}_claims WHERE id = ?"
+        self._select_all = f"SELECT data FROM {table} ORDER BY seq"
+        self._count = f"SELECT COUNT(*) FROM {table}"
+        self._log_change = f"INSERT INTO {table}_changes (id) VALUES (?)"
+        self._forget_changes = f"DELETE FROM {table}_changes WHERE rev <= ?"
+        self._set_reset_at = (
+            f"INSERT INTO {table}_meta (key, value) VALUES ('reset_at', ?)"
+            " ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)"
+        )
+        self._revision = (
+            f"SELECT (SELECT IFNULL(MAX(rev), 0) FROM {table}_changes),"
+            f" (SELECT IFNULL(MAX(value), 0) FROM {table}_meta WHERE key = 'reset_at')"
+        )
+        self._changed = (
+            f"SELECT data FROM {table} WHERE id IN (SELECT id FROM {table}_changes WHERE rev > ? AND rev <= ?)"
+        )
+        db.write(self._create_tables)
+
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        # executescript would commit the writer's open transaction, so one statement at a time
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL UNIQUE,
+                data TEXT NOT NULL
+            )
+        """)
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table}_claims (
+                claim TEXT PRIMARY KEY,
+                id TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+        # Every add and update leaves the record's id here, so other workers sharing
+        # the file can pick up what changed since they last looked
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table}_changes (
+                rev INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL
+            )
+        """)
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table}_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        # Each field's index continues in page order, so a filtered page seeks straight to its
+        # cursor instead of sorting every match; it serves plain lookups on the field too
+        created = self._field("created_at")
+        for field in self.indexes:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_{field}_page"
+                f" ON {self.table} ({self._field(field)}, {created}, id)"
+            )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_page ON {self.table} ({created}, id)")
+        self._analyze(conn)
+
+    def _analyze(self, conn: sqlite3.Connection) -> None:
+        # Without statistics SQLite may pick the least selective index of several that match
+        conn.execute(f"ANALYZE {self.table}")
+        self._analyzed_rows = conn.execute(self._count).fetchone()[0]
+        self._rows_since_analyze = 0
+
+    @staticmethod
+    def _field(field: str) -> str:
+        # Queries must spell the expression exactly like the index for SQLite to use it
+        return f"json_extract(data, '$.{field}')"
+
+    def _claim_rows(self, item: ModelT) -> List[Tuple[str, str]]:
+        return [(claim_key(c), item.id) for c in self._claims_of(item)] if self._claims_of else []
+
+    def add(self, item: ModelT) -> ModelT:
+        row = (item.id, item.model_dump_json())
+        claims = self._claim_rows(item)
+
+        def insert(conn: sqlite3.Connection) -> None:
+            try:
+                conn.execute(self._insert, row)
+                conn.executemany(self._insert_claim, claims)
+            except sqlite3.IntegrityError as e:
+                raise ClaimConflict(item.id) from e
+            self._changed_record(conn, item.id)
+            self._rows_since_analyze += 1
+            if self._rows_since_analyze >= max(ANALYZE_MIN_ROWS, self._analyzed_rows):
+                self._analyze(conn)
+
+        self.db.write(insert)
+        return item
+
+    def _changed_record(self, conn: sqlite3.Connection, item_id: str) -> None:
+        rev = conn.execute(self._log_change, (item_id,)).lastrowid
+        if rev % MAX_CHANGES == 0:
+            # Forget the older half; workers further behind reload everything
+            conn.execute(self._forget_changes, (rev - MAX_CHANGES // 2,))
+            conn.execute(self._set_reset_at, (rev - MAX_CHANGES // 2,))
+
+    def get(self, item_id: str) -> Optional[ModelT]:
+        with self.db.reader() as conn:
+            row = conn.execute(self._select_one, (item_id,)).fetchone()
+        return self.model.model_validate_json(row[0]) if row else None
+
+    def update(self, item_id: str, change: Change) -> Optional[ModelT]:
+        def apply(conn: sqlite3.Connection) -> Optional[ModelT]:
+            # Inside the writer's transaction, so no other write interleaves
+            row = conn.execute(self._select_one, (item_id,)).fetchone()
+            if row is None:
+                return None
+            updated = change(self.model.model_validate_json(row[0]))
+            conn.execute(self._update, (updated.model_dump_json(), item_id))
+            conn.execute(self._delete_claims, (item_id,))
+            try:
+                conn.executemany(self._insert_claim, self._claim_rows(updated))
+            except sqlite3.IntegrityError as e:
+                raise ClaimConflict(item_id) from e
+            self._changed_record(conn, item_id)
+            return updated
+
+        return self.db.write(apply)
+
+    def list(self) -> List[ModelT]:
+        with self.db.reader() as conn:
+            rows = conn.execute(self._select_all).fetchall()
+        return [self.model.model_validate_json(data) for (data,) in rows]
+
+    def _where(self, criteria: Dict[str, Any]) -> List[str]:
+        unknown = set(criteria) - set(self.indexes)
+        if unknown:
+            raise ValueError(f"Not indexed: {', '.join(sorted(unknown))}")
+        return [f"{self._field(field)} = ?" for field in criteria]
+
+    def find(self, **criteria: Any) -> List[ModelT]:
+        where = " AND ".join(self._where(criteria))
+        with self.db.reader() as conn:
+            rows = conn.execute(
+                f"SELECT data FROM {self.table} WHERE {where} ORDER BY seq", tuple(criteria.values())
+            ).fetchall()
+        return [self.model.model_validate_json(data) for (data,) in rows]
+
+    def page(self, limit: int, after: Optional[PageKey] = None, **criteria: Any) -> List[ModelT]:
+        where, params = self._where(criteria), list(criteria.values())
+        created = self._field("created_at")
+        if after is not None:
+            # Spelled so the leading >= can seek the page index; a row-value comparison scans it
+            where.append(f"{created} >= ? AND ({created} > ? OR id > ?)")
+            created_at = _DATETIME.dump_python(after[0], mode="json")
+            params += [created_at, created_at, after[1]]
+        sql = f"SELECT data FROM {self.table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {created}, id LIMIT ?"
+        with self.db.reader() as conn:
+            rows = conn.execute(sql, (*params, limit)).fetchall()
+        return [self.model.model_validate_json(data) for (data,) in rows]
+
+    def changes_since(self, revision: Optional[int]) -> Tuple[int, Optional[List[ModelT]]]:
+        with self.db.reader() as conn:
+            # One read transaction, so the revision and the rows agree
+            conn.execute("BEGIN")
+            try:
+                current, reset_at = conn.execute(self._revision).fetchone()
+                if revision is None or not reset_at <= revision <= current:
+                    return current, None
+                rows = conn.execute(self._changed, (revision, current)).fetchall() if revision < current else []
+            finally:
+                conn.execute("COMMIT")
+        return current, [self.model.model_validate_json(data) for (data,) in rows]
+
+    def replace_all(self, items: Iterable[ModelT]) -> None:
+        items = list(items)
+        rows = [(item.id, item.model_dump_json()) for item in items]
+        claims = [claim for item in items for claim in self._claim_rows(item)]
+
+        def replace(conn: sqlite3.Connection) -> None:
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.execute(f"DELETE FROM {self.table}_claims")
+            conn.executemany(self._insert, rows)
+            conn.executemany(f"INSERT OR IGNORE INTO {self.table}_claims (claim, id) VALUES (?, ?)", claims)
+            # Readers behind this marker must reload everything
+            conn.execute(f"DELETE FROM {self.table}_changes")
+            conn.execute(self._set_reset_at, (conn.execute(self._log_change, ("",)).lastrowid,))
+            self._analyze(conn)
+
+        self.db.write(replace)
+
+    def __len__(self) -> int:
+        with self.db.reader() as conn:
+            return conn.execute(self._count).fetchone()[0]
@@ -0,0 +1,251 @@
+"""In-process benchmarks for the CleanFee API.
+
+Drives ``backend.main.create_app()`` through httpx's ASGI transport (no
+network) against synthetic datasets of several sizes and reports
+throughput and p50/p95/p99 latency per endpoint scenario as JSON::
+
+    python -m benchmarks.bench_api --sizes 1000 10000 --out bench.json
+    python -m benchmarks.bench_api --sizes 1000 10000 --compare bench.json
+
+With ``--compare`` the run exits non-zero when any scenario's p95 latency
+regressed by more than ``--threshold`` against the earlier results.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+# Benchmark bookings go to a scratch database unless one is configured
+os.environ.setdefault("CLEANFEE_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="cleanfee-bench-"), "bench.db"))
+
+from backend.main import create_app
+from data.availability import get_availability_store, slot_has_started
+from data.generator import generate_marketplace, load_dataset
+
+
+# GET /api/cleaners filter combinations
+LIST_FILTERS: Dict[str, Dict[str, Any]] = {
+    "all": {},
+    "search": {"q": "deep"},
+    "search_multi": {"q": "pet friendly"},
+    "min_rating": {"min_rating": 4.5},
+    "rate_range": {"min_rate": 20, "max_rate": 30},
+    "min_experience": {"min_experience": 5},
+    "skills_any": {"skills": "Deep Cleaning,Pet-friendly"},
+    "skills_all": {"skills": "Deep Cleaning,Pet-friendly", "skill_match": "all"},
+    "combined": {"q": "clean", "min_rating": 4.3, "max_rate": 35, "skills": "Eco-friendly"},
+    "sorted": {"sort": "rating"},
+    "first_page": {"sort": "rating", "limit": 20},
+    "relevance_page": {"sort": "relevance", "limit": 20},
+    "available_week": {"available_from": date.today().isoformat(), "available_to": (date.today() + timedelta(days=6)).isoformat()},
+    "combined_page": {"min_rating": 4.3, "skills": "Insured", "sort": "price", "limit": 20},
+}
+
+RequestFactory = Callable[[random.Random], Tuple[str, str, Dict[str, Any]]]
+
+# Random picks tried for a cleaner and day with an open slot before settling for a taken one
+OPEN_SLOT_ATTEMPTS = 100
+
+
+def pick_open_slot(rng: random.Random, n_cleaners: int) -> Tuple[int, date, str]:
+    """A random cleaner, day and slot that is still bookable, so booking requests measure successes"""
+    store, today, now = get_availability_store(), date.today(), datetime.now()
+    for _ in range(OPEN_SLOT_ATTEMPTS):
+        cleaner_id, day = rng.randint(1, n_cleaners), today + timedelta(days=rng.randint(0, 29))
+        slots = [slot for slot in store.available_slots(cleaner_id, day) if not slot_has_started(day, slot, now)]
+        if slots:
+            return cleaner_id, day, rng.choice(slots)
+    return cleaner_id, day, "5:00 PM"
+
+
+def booking_request(rng: random.Random, n_cleaners: int) -> Tuple[str, str, Dict[str, Any]]:
+    cleaner_id, day, time_slot = pick_open_slot(rng, n_cleaners)
+    return "POST", "/api/bookings", {"json": {
+        "cleaner_id": cleaner_id,
+        "customer_name": "Bench Customer",
+        "customer_phone": f"+1555{rng.randint(0, 9_999_999):07d}",
+        "address": f"{rng.randint(1, 9999)} Main St",
+        "date": day.isoformat(),
+        "time_slot": time_slot,
+    }}
+
+
+def build_scenarios(n_cleaners: int) -> Dict[str, RequestFactory]:
+    """Scenario name -> factory producing (method, url, request kwargs)"""
+    today = date.today()
+    scenarios: Dict[str, RequestFactory] = {}
+    for name, params in LIST_FILTERS.items():
+        scenarios[f"list_cleaners[{name}]"] = lambda rng, params=params: ("GET", "/api/cleaners", {"params": params})
+    scenarios["cleaner_facets"] = lambda rng: ("GET", "/api/cleaners/facets", {"params": {"min_rating": 4.5}})
+    scenarios["get_cleaner"] = lambda rng: ("GET", f"/api/cleaners/{rng.randint(1, n_cleaners)}", {})
+    scenarios["availability_grid"] = lambda rng: ("GET", "/api/availability", {"params": {
+        "cleaner_ids": ",".join(str(rng.randint(1, n_cleaners)) for _ in range(50)),
+        "from": today.isoformat(),
+        "to": (today + timedelta(days=13)).isoformat(),
+    }})
+    scenarios["earliest_slots"] = lambda rng: ("GET", "/api/availability/earliest", {"params": {
+        "skills": "Deep Cleaning", "min_rating": 4.0, "duration": rng.randint(1, 4), "limit": 20,
+    }})
+    scenarios["create_booking"] = lambda rng: booking_request(rng, n_cleaners)
+    scenarios["list_bookings"] = lambda rng: ("GET", "/api/bookings", {})
+    scenarios["bookings_page"] = lambda rng: ("GET", "/api/bookings", {"params": {"limit": 50, "fields": "id,status,date"}})
+    scenarios["cleaner_schedule"] = lambda rng: ("GET", "/api/bookings", {"params": {
+        "cleaner_id": rng.randint(1, n_cleaners),
+        "date": (today + timedelta(days=rng.randint(0, 29))).isoformat(),
+    }})
+    scenarios["pending_bookings_for_cleaner"] = lambda rng: ("GET", "/api/bookings", {"params": {
+        "status": "pending", "cleaner_id": rng.randint(1, n_cleaners),
+    }})
+    scenarios["create_application"] = lambda rng: ("POST", "/api/applications", {"json": {
+        "first_name": "Bench",
+        "last_name": "Applicant",
+        "email": f"bench{rng.randint(0, 10**9)}@example.com",
+        "phone": "+15550000000",
+        "dob": "1990-01-01",
+        "experience_years": rng.randint(0, 20),
+        "skills": ["Deep Cleaning"],
+    }})
+    return scenarios
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    factory: RequestFactory,
+    requests: int,
+    warmup: int,
+    concurrency: int,
+    seed: int,
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        method, url, kwargs = factory(rng)
+        await client.request(method, url, **kwargs)
+
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            method, url, kwargs = factory(rng)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput_rps": round(requests / elapsed, 2),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+        "status": dict(statuses),
+    }
+
+
+async def run_size(size: int, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    load_started = time.perf_counter()
+    load_dataset(generate_marketplace(cleaners=size, seed=args.seed))
+    load_seconds = time.perf_counter() - load_started
+    app = create_app()
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, factory in build_scenarios(size).items():
+            if args.only and not any(pattern in name for pattern in args.only):
+                continue
+            stats = await run_scenario(client, factory, args.requests, args.warmup, args.concurrency, args.seed)
+            results.append({"size": size, "scenario": name, "load_seconds": round(load_seconds, 3), **stats})
+            print(
+                f"{size:>8} {name:<36} {stats['throughput_rps']:>10.1f} rps"
+                f"  p50 {stats['p50_ms']:>8.2f}ms  p95 {stats['p95_ms']:>8.2f}ms  p99 {stats['p99_ms']:>8.2f}ms",
+                file=sys.stderr,
+            )
+    return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: List[Dict[str, Any]], baseline_path: str, threshold: float) -> List[str]:
+    """Scenarios whose p95 latency grew by more than ``threshold`` (a fraction)"""
+    with open(baseline_path) as f:
+        baseline = {(r["size"], r["scenario"], r["concurrency"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for result in current:
+        before = baseline.get((result["size"], result["scenario"], result["concurrency"]))
+        if before and before["p95_ms"] > 0 and result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{result['size']} {result['scenario']}: p95 {before['p95_ms']}ms -> {result['p95_ms']}ms"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the CleanFee API in-process")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="catalog sizes")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="concurrent in-flight requests")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", help="run scenarios whose name contains any of these")
+    parser.add_argument("--out", help="write JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="earlier JSON results to check for p95 regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p95 growth, as a fraction")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        results.extend(asyncio.run(run_size(size, args)))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        },
+        "results": results,
+    }
+    # Read the baseline before writing, in case --out points at the same file
+    regressions = compare(results, args.compare, args.threshold) if args.compare else []
+
+    payload = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
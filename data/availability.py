@@ -0,0 +1,319 @@
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .catalog import CleanerCatalog, get_catalog
+from .reservations import RESERVATIONS, ReservationBook, SlotConflict
+
+
+TIME_SLOTS = ["9:00 AM", "10:00 AM", "11:00 AM", "1:00 PM", "2:00 PM", "3:00 PM", "4:00 PM", "5:00 PM"]
+SLOT_INDEX = {slot: i for i, slot in enumerate(TIME_SLOTS)}
+ALL_SLOTS = (1 << len(TIME_SLOTS)) - 1
+# Start hour of each slot; a booking of N hours takes N slots with consecutive hours
+SLOT_HOURS = [9, 10, 11, 13, 14, 15, 16, 17]
+MAX_DURATION = 5
+
+# Days from today that can be booked (and are precomputed)
+HORIZON_DAYS = 30
+# Open slots per cleaner and working day
+MIN_OPEN_SLOTS = 3
+MAX_OPEN_SLOTS = 6
+# Share of (cleaner, day) pairs that are days off, with no open slots
+DAY_OFF_PERCENT = 30
+
+# Cleaners generated per vectorized chunk, bounding the (cleaners, days, slots) temporaries
+_CHUNK = 8192
+_SLOT_BITS = np.uint8(1) << np.arange(len(TIME_SLOTS), dtype=np.uint8)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer; uint64 arithmetic wraps as intended"""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def generate_slot_bits(cleaner_ids: np.ndarray, days: Sequence[date]) -> np.ndarray:
+    """Open-slot bitmaps, shape (cleaners, days); a pure function of (cleaner id, date)"""
+    ordinals = np.array([d.toordinal() for d in days], dtype=np.uint64)
+    cleaner_ids = np.asarray(cleaner_ids, dtype=np.int64).astype(np.uint64)
+    out = np.empty((len(cleaner_ids), len(ordinals)), dtype=np.uint8)
+    slots = np.arange(1, len(TIME_SLOTS) + 1, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    for start in range(0, len(cleaner_ids), _CHUNK):
+        chunk = cleaner_ids[start:start + _CHUNK]
+        seeds = _mix(_mix(chunk[:, None]) + ordinals[None, :])
+        counts = MIN_OPEN_SLOTS + (seeds % np.uint64(MAX_OPEN_SLOTS - MIN_OPEN_SLOTS + 1)).astype(np.int64)
+        # Open the ``count`` slots with the smallest hash keys
+        ranks = np.argsort(np.argsort(_mix(seeds[:, :, None] + slots), axis=2), axis=2)
+        chosen = ranks < counts[:, :, None]
+        chosen &= (_mix(~seeds) % np.uint64(100) >= np.uint64(DAY_OFF_PERCENT))[:, :, None]
+        out[start:start + _CHUNK] = (chosen * _SLOT_BITS).sum(axis=2, dtype=np.uint8)
+    return out
+
+
+def booking_bits(start_slot: int, duration: int) -> Optional[int]:
+    """Slots covered by a booking, or ``None`` if it runs past the day or across the lunch gap"""
+    hours = SLOT_HOURS[start_slot:start_slot + duration]
+    if len(hours) < duration or hours[-1] - hours[0] != duration - 1:
+        return None
+    return ((1 << duration) - 1) << start_slot
+
+
+def slot_has_started(day: date, time_slot: str, now: Optional[datetime] = None) -> bool:
+    """Whether ``time_slot`` on ``day`` starts before ``now`` (local time), so it can no longer be booked"""
+    return datetime.combine(day, time(SLOT_HOURS[SLOT_INDEX[time_slot]])) < (now or datetime.now())
+
+
+def _start_table(duration: int) -> np.ndarray:
+    table = np.zeros(ALL_SLOTS + 1, dtype=np.uint8)
+    for start in range(len(TIME_SLOTS)):
+        needed = booking_bits(start, duration)
+        if needed is not None:
+            fits = (np.arange(ALL_SLOTS + 1) & needed) == needed
+            table[fits] |= 1 << start
+    return table
+
+
+# START_TABLES[duration - 1][open_bits] -> bitmask of slots a booking of that length can start at
+START_TABLES = np.stack([_start_table(d) for d in range(1, MAX_DURATION + 1)])
+
+
+def start_bits(bits: np.ndarray, duration: int) -> np.ndarray:
+    """Possible start slots for a booking of ``duration`` hours, per open-slot bitmap"""
+    return START_TABLES[duration - 1][bits]
+
+
+def slots_to_bits(slots: Iterable[str]) -> int:
+    bits = 0
+    for slot in slots:
+        bits |= 1 << SLOT_INDEX[slot]
+    return bits
+
+
+def bits_to_slots(bits: int) -> List[str]:
+    """Slot labels set in ``bits``, in time order"""
+    return [slot for i, slot in enumerate(TIME_SLOTS) if bits >> i & 1]
+
+
+class AvailabilityStore:
+    """Open-slot bitmaps for a catalog's cleaners over the booking horizon, net of bookings"""
+
+    def __init__(
+        self,
+        catalog: CleanerCatalog,
+        start: date,
+        days: int = HORIZON_DAYS,
+        reservations: ReservationBook = RESERVATIONS,
+    ):
+        self.start = start
+        self.days = days
+        self.cleaner_ids = catalog.ids
+        self._catalog = catalog
+        self._reservations = reservations
+        self._lock = threading.Lock()
+        # Slots the cleaner works; ``bits`` is what is still free after bookings
+        self.base = generate_slot_bits(catalog.ids, self.horizon())
+        self.base.setflags(write=False)
+        self.bits = self.base.copy()
+        for col, day in enumerate(self.horizon()):
+            for cleaner_id, booked in reservations.day(day).items():
+                pos = catalog.position(cleaner_id)
+                if pos is not None and pos < len(self.bits):
+                    self.bits[pos, col] &= ALL_SLOTS & ~booked
+        # Per day, a packed bitset over catalog rows of "has any open slot"
+        self.open_rows = np.packbits((self.bits != 0).T, axis=1, bitorder="little")
+
+    def day_index(self, day: date) -> Optional[int]:
+        """Column of ``day`` in :attr:`bits`, or ``None`` outside the horizon"""
+        offset = (day - self.start).days
+        return offset if 0 <= offset < self.days else None
+
+    def _position(self, cleaner_id: int) -> Optional[int]:
+        pos = self._catalog.position(cleaner_id)
+        return pos if pos is not None and pos < len(self.bits) else None
+
+    def _derived(self, cleaner_ids: Sequence[int], days: Sequence[date]) -> np.ndarray:
+        # Outside what was precomputed: the bitmap is a pure function, so derive it
+        out = generate_slot_bits(np.asarray(cleaner_ids), days)
+        rows = {int(cleaner_id): r for r, cleaner_id in enumerate(cleaner_ids)}
+        for k, day in enumerate(days):
+            for cleaner_id, booked in self._reservations.day(day).items():
+                r = rows.get(cleaner_id)
+                if r is not None:
+                    out[r, k] &= ALL_SLOTS & ~booked
+        return out
+
+    def slot_bits(self, cleaner_id: int, day: date) -> int:
+        pos = self._position(cleaner_id)
+        col = self.day_index(day)
+        if pos is None or col is None:
+            return int(self._derived([cleaner_id], [day])[0, 0])
+        return int(self.bits[pos, col])
+
+    def available_slots(self, cleaner_id: int, day: date) -> List[str]:
+        return bits_to_slots(self.slot_bits(cleaner_id, day))
+
+    def _set_free(self, pos: int, col: int, bits: int) -> None:
+        with self._lock:
+            self.bits[pos, col] = bits
+            byte, bit = divmod(pos, 8)
+            if bits:
+                self.open_rows[col, byte] |= np.uint8(1 << bit)
+            else:
+                self.open_rows[col, byte] &= np.uint8(~(1 << bit) & 0xFF)
+
+    def book(self, cleaner_id: int, day: date, bits: int) -> None:
+        """Take booked slots out of the free bitmaps"""
+        pos, col = self._position(cleaner_id), self.day_index(day)
+        if pos is not None and col is not None:
+            self._set_free(pos, col, int(self.bits[pos, col]) & ~bits)
+
+    def unbook(self, cleaner_id: int, day: date) -> None:
+        """Recompute a cleaner's free slots on ``day`` after bookings were released"""
+        pos, col = self._position(cleaner_id), self.day_index(day)
+        if pos is not None and col is not None:
+            self._set_free(pos, col, int(self.base[pos, col]) & ~self._reservations.booked_bits(cleaner_id, day))
+
+    def horizon(self) -> List[date]:
+        return [self.start + timedelta(days=i) for i in range(self.days)]
+
+    def rows(self, cleaner_ids: Sequence[int]) -> np.ndarray:
+        """Bitmaps over the whole horizon for several cleaners, shape (cleaners, days)"""
+        ids = np.asarray(cleaner_ids, dtype=np.int64)
+        positions = [self._position(int(i)) for i in ids]
+        known = np.array([p is not None for p in positions], dtype=bool)
+        out = np.empty((len(ids), self.days), dtype=np.uint8)
+        out[known] = self.bits[[p for p in positions if p is not None]]
+        if not known.all():
+            out[~known] = self._derived(ids[~known], self.horizon())
+        return out
+
+    def grid(self, cleaner_ids: Sequence[int], first: date, last: date) -> np.ndarray:
+        """Bitmaps for several cleaners over ``[first, last]``, shape (cleaners, days)"""
+        days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        cols = [self.day_index(day) for day in days]
+        out = np.empty((len(cleaner_ids), len(days)), dtype=np.uint8)
+        inside = [i for i, col in enumerate(cols) if col is not None]
+        if inside:
+            out[:, inside] = self.rows(cleaner_ids)[:, [cols[i] for i in inside]]
+        outside = [i for i, col in enumerate(cols) if col is None]
+        if outside:
+            out[:, outside] = self._derived(cleaner_ids, [days[i] for i in outside])
+        return out
+
+    def open_mask(self, first: date, last: date) -> np.ndarray:
+        """Boolean row mask of cleaners with an open slot on some day in ``[first, last]``"""
+        n = len(self.cleaner_ids)
+        lo = max((first - self.start).days, 0)
+        hi = min((last - self.start).days, self.days - 1)
+        if lo <= hi:
+            packed = np.bitwise_or.reduce(self.open_rows[lo:hi + 1], axis=0)
+            mask = np.unpackbits(packed, count=n, bitorder="little").astype(bool)
+        else:
+            mask = np.zeros(n, dtype=bool)
+        outside = [
+            first + timedelta(days=i)
+            for i in range((last - first).days + 1)
+            if self.day_index(first + timedelta(days=i)) is None
+        ]
+        if outside:
+            mask |= (self._derived(self.cleaner_ids, outside) != 0).any(axis=1)
+        return mask
+
+
+_STORE: Optional[AvailabilityStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_availability_store(catalog: Optional[CleanerCatalog] = None) -> AvailabilityStore:
+    """Store for the current catalog starting today; rebuilt when either moves on"""
+    global _STORE
+    catalog = catalog or get_catalog()
+    today = date.today()
+    store = _STORE
+    # Edits that keep the cleaner set keep catalog.ids, so only additions and reloads rebuild
+    if store is not None and store.start == today and store.cleaner_ids is catalog.ids:
+        return store
+    with _STORE_LOCK:
+        store = _STORE
+        if store is None or store.start != today or store.cleaner_ids is not catalog.ids:
+            # No booking may land between reading the book and publishing the store
+            with RESERVATIONS.all_locks():
+                store = AvailabilityStore(catalog, today)
+                _STORE = store
+    return store
+
+
+def reserve_slots(cleaner_id: int, day: date, time_slot: str, duration: int) -> int:
+    """Atomically book ``duration`` hours from ``time_slot``; ``SlotConflict`` if any is taken
+
+    ``ValueError`` for a slot that does not exist or a booking that does not fit the day.
+    """
+    if time_slot not in SLOT_INDEX:
+        raise ValueError(f"Unknown time slot {time_slot!r}")
+    needed = booking_bits(SLOT_INDEX[time_slot], duration)
+    if needed is None:
+        raise ValueError(f"A {duration}-hour booking cannot start at {time_slot}")
+    get_availability_store()
+    with RESERVATIONS.lock_for(cleaner_id):
+        # Re-read under the stripe: a rebuild publishes only while holding every stripe
+        store = _STORE
+        if store.slot_bits(cleaner_id, day) & needed != needed:
+            raise SlotConflict(f"{time_slot} on {day.isoformat()} is no longer available for {duration}h")
+        RESERVATIONS.mark(cleaner_id, day, needed)
+        store.book(cleaner_id, day, needed)
+    return needed
+
+
+def hold_slots(cleaner_id: int, day: date, bits: int) -> None:
+    """Mark slots booked elsewhere (e.g. through another worker) without checking them"""
+    get_availability_store()
+    with RESERVATIONS.lock_for(cleaner_id):
+        RESERVATIONS.mark(cleaner_id, day, bits)
+        _STORE.book(cleaner_id, day, bits)
+
+
+def drop_slots(cleaner_id: int, day: date, bits: int) -> None:
+    """Give booked slots back, e.g. when their booking is cancelled"""
+    get_availability_store()
+    with RESERVATIONS.lock_for(cleaner_id):
+        RESERVATIONS.unmark(cleaner_id, day, bits)
+        _STORE.unbook(cleaner_id, day)
+
+
+def replace_reservations(holds: Iterable[Tuple[int, date, int]]) -> None:
+    """Swap the whole reservation book for ``holds`` and rebuild the open-slot bitmaps from it"""
+    global _STORE
+    catalog = get_catalog()
+    with _STORE_LOCK:
+        with RESERVATIONS.all_locks():
+            RESERVATIONS.replace(holds)
+            _STORE = AvailabilityStore(catalog, date.today())
+
+
+# Booking statuses that hold their slots
+HOLDING_STATUSES = ("pending", "confirmed")
+
+
+def booking_hold(booking) -> Optional[Tuple[int, date, int]]:
+    """(cleaner, day, slot bits) a stored booking holds, or None if it holds nothing"""
+    if booking.status not in HOLDING_STATUSES or booking.time_slot not in SLOT_INDEX:
+        return None
+    bits = booking_bits(SLOT_INDEX[booking.time_slot], booking.duration)
+    return None if bits is None else (booking.cleaner_id, date.fromisoformat(booking.date), bits)
+
+
+def bookable_durations(cleaner_id: int, day: date, time_slot: str) -> List[int]:
+    """Booking lengths in hours that fit the cleaner's free slots from ``time_slot``"""
+    free = get_availability_store().slot_bits(cleaner_id, day)
+    durations = []
+    for duration in range(1, MAX_DURATION + 1):
+        needed = booking_bits(SLOT_INDEX[time_slot], duration)
+        if needed is None or free & needed != needed:
+            break
+        durations.append(duration)
+    return durations
@@ -0,0 +1,387 @@
+import copy
+import itertools
+import json
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .cursors import decode_cursor, encode_cursor
+from .ranking import ranked
+from .skill_index import SkillIndex
+from .sort_index import SortIndex
+from .text_index import TextIndex
+
+
+# Sort keys shared by the API and the Streamlit frontend: name -> (column, descending)
+SORT_KEYS = {
+    "rating": ("rating", True),
+    "price": ("hourly_rate", False),
+    "experience": ("experience_years", True),
+    "reviews": ("total_reviews", True),
+}
+
+# Sorts on a score derived from the whole catalog (see ranking.py); any single edit can
+# shift every key, so they are recomputed per version instead of kept in a SortIndex
+SCORED_SORTS = ("relevance",)
+
+# Catalog versions are process-wide so caches keyed by version never see a reused number
+_VERSIONS = itertools.count(1)
+
+
+def _encode_json(record: Dict[str, Any]) -> bytes:
+    # Same settings as FastAPI's JSONResponse
+    return json.dumps(record, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _search_text(cleaner: Dict[str, Any]) -> str:
+    return "\n".join([cleaner["name"], cleaner.get("bio", ""), *cleaner.get("skills", [])])
+
+
+def encode_sort_cursor(sort_by: Optional[str], key: Any, cleaner_id: int) -> str:
+    """Opaque keyset cursor for the row with sort key ``key`` and id ``cleaner_id``"""
+    return encode_cursor(sort_by, key.item() if hasattr(key, "item") else key, int(cleaner_id))
+
+
+def decode_sort_cursor(cursor: str, sort_by: Optional[str]) -> Tuple[Any, int]:
+    """Sort key and id from a cursor; ``ValueError`` if malformed or for another sort"""
+    # Every sort key is a number; anything else would reach searchsorted
+    cursor_sort, key, cleaner_id = decode_cursor(cursor, object, float, int)
+    if cursor_sort != sort_by:
+        raise ValueError("Cursor belongs to a different sort order")
+    return key, cleaner_id
+
+
+class CleanerCatalog:
+    """Columnar, versioned store of the cleaner records
+
+    A published version is never modified: ``add_cleaner`` and ``update_cleaner``
+    return the next version, copying only what the change touches, so readers
+    holding a version see the same rows, columns and indexes throughout.
+    """
+
+    def __init__(self, cleaners: Iterable[Dict[str, Any]]):
+        self.version = next(_VERSIONS)
+        # Kept by every version derived from this one, so it changes only when the catalog is rebuilt
+        self.base_version = self.version
+        self._lock = threading.Lock()
+        self.records: List[Dict[str, Any]] = [dict(c) for c in cleaners]
+        records = self.records
+
+        self.ids = np.array([c["id"] for c in records], dtype=np.int64)
+        self.hourly_rate = np.array([c["hourly_rate"] for c in records], dtype=np.float64)
+        self.rating = np.array([c["rating"] for c in records], dtype=np.float64)
+        self.total_reviews = np.array([c["total_reviews"] for c in records], dtype=np.int64)
+        self.experience_years = np.array([c["experience_years"] for c in records], dtype=np.int64)
+        self.verified = np.array([bool(c.get("verified", False)) for c in records], dtype=bool)
+        self._positions: Dict[int, int] = {int(cid): pos for pos, cid in enumerate(self.ids)}
+
+        # Skills side-table: one (row, skill code) pair per cleaner skill
+        self.skill_vocab: List[str] = []
+        self.skill_codes: Dict[str, int] = {}
+        rows, codes = [], []
+        for pos, c in enumerate(records):
+            for skill in c.get("skills", []):
+                rows.append(pos)
+                codes.append(self._skill_code(skill))
+        self.skill_rows = np.array(rows, dtype=np.int64)
+        self.skill_ids = np.array(codes, dtype=np.int32)
+        self.skill_index = SkillIndex(self.skill_rows, self.skill_ids, len(self.skill_vocab), len(records))
+
+        self.text_index = TextIndex(_search_text(c) for c in records)
+        self._sort_indexes: Dict[Optional[str], SortIndex] = {}
+        self._json: List[Optional[bytes]] = [None] * len(records)
+        self._dataframe: Optional[pd.DataFrame] = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _next_version(self) -> "CleanerCatalog":
+        # Shares everything; callers copy each part before changing it
+        catalog = copy.copy(self)
+        catalog.version = next(_VERSIONS)
+        catalog._lock = threading.Lock()
+        catalog.records = list(self.records)
+        catalog._json = list(self._json)
+        catalog._sort_indexes = {sort_by: index.copy() for sort_by, index in list(self._sort_indexes.items())}
+        catalog._dataframe = None
+        return catalog
+
+    def _copy_skills(self) -> None:
+        self.skill_vocab = list(self.skill_vocab)
+        self.skill_codes = dict(self.skill_codes)
+        self.skill_index = self.skill_index.copy()
+
+    def add_cleaner(self, cleaner: Dict[str, Any]) -> "CleanerCatalog":
+        """Next version with a cleaner appended, its indexes extended"""
+        record = dict(cleaner)
+        catalog = self._next_version()
+        pos = len(self.records)
+        catalog.ids = np.append(self.ids, record["id"])
+        catalog.hourly_rate = np.append(self.hourly_rate, float(record["hourly_rate"]))
+        catalog.rating = np.append(self.rating, float(record["rating"]))
+        catalog.total_reviews = np.append(self.total_reviews, record["total_reviews"])
+        catalog.experience_years = np.append(self.experience_years, record["experience_years"])
+        catalog.verified = np.append(self.verified, bool(record.get("verified", False)))
+        catalog._copy_skills()
+        codes = [catalog._skill_code(skill) for skill in record.get("skills", [])]
+        catalog.skill_rows = np.append(self.skill_rows, np.full(len(codes), pos, dtype=np.int64))
+        catalog.skill_ids = np.append(self.skill_ids, np.array(codes, dtype=np.int32))
+        catalog.skill_index.add(pos, codes)
+        catalog.text_index = self.text_index.copy()
+        catalog.text_index.add(_search_text(record))
+        catalog.records.append(record)
+        catalog._json.append(None)
+        catalog._positions = {**self._positions, int(record["id"]): pos}
+        for sort_by, index in catalog._sort_indexes.items():
+            index.add(pos, catalog._sort_key(sort_by, pos), int(record["id"]))
+        return catalog
+
+    def update_cleaner(self, cleaner_id: int, changes: Dict[str, Any]) -> "CleanerCatalog":
+        """Next version with field changes applied to one cleaner, moved within every index"""
+        pos = self._positions[cleaner_id]
+        old = self.records[pos]
+        record = {**old, **changes, "id": old["id"]}
+        catalog = self._next_version()
+
+        catalog.hourly_rate = self.hourly_rate.copy()
+        catalog.rating = self.rating.copy()
+        catalog.total_reviews = self.total_reviews.copy()
+        catalog.experience_years = self.experience_years.copy()
+        catalog.verified = self.verified.copy()
+        catalog.hourly_rate[pos] = float(record["hourly_rate"])
+        catalog.rating[pos] = float(record["rating"])
+        catalog.total_reviews[pos] = record["total_reviews"]
+        catalog.experience_years[pos] = record["experience_years"]
+        catalog.verified[pos] = bool(record.get("verified", False))
+        for sort_by, index in catalog._sort_indexes.items():
+            index.update(pos, self._sort_key(sort_by, pos), catalog._sort_key(sort_by, pos), cleaner_id)
+
+        if record.get("skills", []) != old.get("skills", []):
+            catalog._copy_skills()
+            old_codes = [self.skill_codes[skill] for skill in old.get("skills", [])]
+            codes = [catalog._skill_code(skill) for skill in record.get("skills", [])]
+            keep = self.skill_rows != pos
+            catalog.skill_rows = np.append(self.skill_rows[keep], np.full(len(codes), pos, dtype=np.int64))
+            catalog.skill_ids = np.append(self.skill_ids[keep], np.array(codes, dtype=np.int32))
+            catalog.skill_index.remove(pos, old_codes)
+            catalog.skill_index.add(pos, codes)
+        if _search_text(record) != _search_text(old):
+            catalog.text_index = self.text_index.copy()
+            catalog.text_index.update(pos, _search_text(record))
+
+        catalog.records[pos] = record
+        catalog._json[pos] = None
+        return catalog
+
+    def _skill_code(self, skill: str) -> int:
+        code = self.skill_codes.setdefault(skill, len(self.skill_vocab))
+        if code == len(self.skill_vocab):
+            self.skill_vocab.append(skill)
+        return code
+
+    def position(self, cleaner_id: int) -> Optional[int]:
+        """Row position of a cleaner id, or ``None`` if unknown"""
+        return self._positions.get(cleaner_id)
+
+    def positions(self, ids: Iterable[int]) -> np.ndarray:
+        """Row positions of the known ids, in request order without duplicates"""
+        seen = {}
+        for cid in ids:
+            pos = self._positions.get(cid)
+            if pos is not None:
+                seen.setdefault(pos, None)
+        return np.fromiter(seen, dtype=np.int64, count=len(seen))
+
+    def get(self, cleaner_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Cleaner record by id, or ``None`` if unknown"""
+        pos = self._positions.get(cleaner_id)
+        return None if pos is None else self.records[pos]
+
+    def get_many(self, ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Cleaner records for the known ids, in request order"""
+        return self.rows(self.positions(ids))
+
+    def rows(self, positions: Sequence[int]) -> List[Dict[str, Any]]:
+        """Return the cleaner records at the given row positions"""
+        return [self.records[p] for p in positions]
+
+    def json_row(self, pos: int) -> bytes:
+        """JSON encoding of one record, cached until that record changes"""
+        encoded = self._json[pos]
+        if encoded is None:
+            encoded = self._json[pos] = _encode_json(self.records[pos])
+        return encoded
+
+    def json_rows(self, positions: Sequence[int]) -> bytes:
+        """JSON array of the records at ``positions``, assembled from cached encodings"""
+        return b"[" + b",".join([self.json_row(p) for p in positions]) + b"]"
+
+    def filter_mask(
+        self,
+        min_rating: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        min_experience: Optional[int] = None,
+    ) -> np.ndarray:
+        """Boolean row mask for the numeric range filters"""
+        mask = np.ones(len(self), dtype=bool)
+        if min_rating is not None:
+            mask &= self.rating >= min_rating
+        if min_rate is not None:
+            mask &= self.hourly_rate >= min_rate
+        if max_rate is not None:
+            mask &= self.hourly_rate <= max_rate
+        if min_experience is not None:
+            mask &= self.experience_years >= min_experience
+        return mask
+
+    def text_mask(self, query: str) -> np.ndarray:
+        """Boolean row mask for cleaners whose name, bio or skills match ``query``"""
+        positions = self.text_index.search(query)
+        if positions is None:
+            return np.ones(len(self), dtype=bool)
+        mask = np.zeros(len(self), dtype=bool)
+        mask[positions] = True
+        return mask
+
+    def skills_mask(self, skills: Iterable[str], match_all: bool = False) -> np.ndarray:
+        """Boolean row mask for cleaners having any (or all) of the given skills"""
+        # Unknown skills get an out-of-range code: ignored by "any", empty for "all"
+        codes = [self.skill_codes.get(s, len(self.skill_vocab)) for s in skills]
+        if not codes:
+            return np.ones(len(self), dtype=bool)
+        if match_all:
+            bitmap = self.skill_index.all_of(codes)
+        else:
+            bitmap = self.skill_index.any_of(codes)
+        return self.skill_index.to_mask(bitmap)
+
+    def ids_mask(self, ids: Iterable[int]) -> np.ndarray:
+        """Boolean row mask for the given cleaner ids"""
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.positions(ids)] = True
+        return mask
+
+    def _sort_keys(self, sort_by: Optional[str]) -> np.ndarray:
+        if sort_by is None:
+            return self.ids
+        if sort_by in SCORED_SORTS:
+            return -ranked(self)[0]
+        column, descending = SORT_KEYS[sort_by]
+        values = getattr(self, column)
+        return -values if descending else values
+
+    def _sort_key(self, sort_by: Optional[str], pos: int) -> Any:
+        # One row's key, without materializing a whole (negated) column
+        if sort_by is None:
+            return self.ids[pos].item()
+        if sort_by in SCORED_SORTS:
+            return -ranked(self)[0][pos].item()
+        column, descending = SORT_KEYS[sort_by]
+        value = getattr(self, column)[pos].item()
+        return -value if descending else value
+
+    def sort_index(self, sort_by: Optional[str] = None) -> SortIndex:
+        """Maintained (key, id) order for a sort key, built on first use"""
+        index = self._sort_indexes.get(sort_by)
+        if index is None:
+            with self._lock:
+                index = self._sort_indexes.get(sort_by)
+                if index is None:
+                    index = SortIndex(self._sort_keys(sort_by), self.ids)
+                    self._sort_indexes[sort_by] = index
+        return index
+
+    def order(self, sort_by: Optional[str] = None) -> np.ndarray:
+        """Row positions in sorted order for a sort key (ties by id)"""
+        if sort_by in SCORED_SORTS:
+            return ranked(self)[1]
+        return self.sort_index(sort_by).arrays()[0]
+
+    def sort_positions(self, positions: np.ndarray, sort_by: Optional[str]) -> np.ndarray:
+        """Order an arbitrary set of row positions by a sort key, ties by id"""
+        return positions[np.lexsort((self.ids[positions], self._sort_keys(sort_by)[positions]))]
+
+    def sorted_rows(self, mask: np.ndarray, sort_by: Optional[str] = None) -> np.ndarray:
+        """Every row position in ``mask``, taken in presorted order"""
+        perm = self.order(sort_by)
+        return perm[mask[perm]]
+
+    def page(
+        self,
+        positions: np.ndarray,
+        sort_by: Optional[str],
+        limit: int,
+        after: Optional[str] = None,
+    ) -> Tuple[np.ndarray, Optional[str]]:
+        """Keyset page of row positions already in ``sort_by`` order, plus the next cursor"""
+        start = 0
+        if after is not None:
+            key, last_id = decode_sort_cursor(after, sort_by)
+            keys = self._sort_keys(sort_by)[positions]
+            lo = np.searchsorted(keys, key, side="left")
+            hi = np.searchsorted(keys, key, side="right")
+            start = lo + np.searchsorted(self.ids[positions[lo:hi]], last_id, side="right")
+        page = positions[start:start + limit]
+        if start + limit >= len(positions):
+            return page, None
+        last = page[-1]
+        return page, encode_sort_cursor(sort_by, self._sort_key(sort_by, last), self.ids[last])
+
+    def warm(self) -> None:
+        """Build the lazily-built indexes and row JSON up front, before publishing"""
+        for sort_by in (None, *SORT_KEYS):
+            self.sort_index(sort_by).arrays()
+        for pos in range(len(self)):
+            self.json_row(pos)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Cached DataFrame view of the current version; treat it as read-only"""
+        if self._dataframe is None:
+            self._dataframe = pd.DataFrame(self.records)
+        return self._dataframe
+
+
+_CATALOG: Optional[CleanerCatalog] = None
+_CATALOG_LOCK = threading.Lock()
+
+
+def get_catalog() -> CleanerCatalog:
+    """Return the current catalog, building it on first use"""
+    if _CATALOG is None:
+        rebuild_catalog()
+    return _CATALOG
+
+
+def rebuild_catalog(cleaners: Optional[Iterable[Dict[str, Any]]] = None) -> CleanerCatalog:
+    """Build a new catalog version and make it current"""
+    if cleaners is None:
+        from .cleaners_data import CLEANERS_DATA
+        cleaners = CLEANERS_DATA
+    return publish_catalog(CleanerCatalog(cleaners))
+
+
+def update_cleaner(cleaner_id: int, change: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Publish the next catalog version with ``change(record)``'s fields applied to one cleaner
+
+    Returns the updated record, or ``None`` for an unknown cleaner. Updates are
+    serialized, so each sees the one before it.
+    """
+    global _CATALOG
+    get_catalog()
+    with _CATALOG_LOCK:
+        record = _CATALOG.get(cleaner_id)
+        if record is None:
+            return None
+        _CATALOG = _CATALOG.update_cleaner(cleaner_id, change(record))
+        return _CATALOG.get(cleaner_id)
+
+
+def publish_catalog(catalog: CleanerCatalog) -> CleanerCatalog:
+    """Make a fully built catalog current; callers holding the old one keep using it"""
+    global _CATALOG
+    with _CATALOG_LOCK:
+        _CATALOG = catalog
+    return catalog
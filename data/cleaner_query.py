@@ -0,0 +1,162 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Hashable, Iterable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .availability import get_availability_store
+from .catalog import CleanerCatalog, get_catalog
+from .reservations import RESERVATIONS
+from .text_index import tokenize
+
+
+class CleanerQuery(NamedTuple):
+    """Filter and sort state for a cleaner listing"""
+
+    q: Optional[str] = None
+    min_rating: Optional[float] = None
+    min_rate: Optional[float] = None
+    max_rate: Optional[float] = None
+    min_experience: Optional[int] = None
+    skills: Tuple[str, ...] = ()
+    match_all_skills: bool = False
+    ids: Optional[Tuple[int, ...]] = None
+    available_from: Optional[date] = None
+    available_to: Optional[date] = None
+    sort: Optional[str] = None
+
+    @classmethod
+    def build(
+        cls,
+        q: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        min_experience: Optional[int] = None,
+        skills: Iterable[str] = (),
+        match_all_skills: bool = False,
+        ids: Optional[Iterable[int]] = None,
+        available_from: Optional[date] = None,
+        available_to: Optional[date] = None,
+        sort: Optional[str] = None,
+    ) -> "CleanerQuery":
+        """Normalized query, so equivalent filter states share one cache entry"""
+        tokens = sorted(set(tokenize(q))) if q else []
+        skills = tuple(sorted(set(skills)))
+        return cls(
+            q=" ".join(tokens) or None,
+            min_rating=None if min_rating is None else float(min_rating),
+            min_rate=None if min_rate is None else float(min_rate),
+            max_rate=None if max_rate is None else float(max_rate),
+            min_experience=None if not min_experience else int(min_experience),
+            skills=skills,
+            match_all_skills=bool(match_all_skills) and len(skills) > 1,
+            ids=None if ids is None else tuple(sorted(set(int(i) for i in ids))),
+            available_from=available_from or available_to,
+            available_to=available_to or available_from,
+            sort=sort,
+        )
+
+    def masks(self, catalog: CleanerCatalog) -> Dict[str, np.ndarray]:
+        """One boolean row mask per active filter dimension"""
+        masks = {}
+        if self.q:
+            masks["text"] = catalog.text_mask(self.q)
+        if self.min_rating is not None:
+            masks["rating"] = catalog.filter_mask(min_rating=self.min_rating)
+        if self.min_rate is not None or self.max_rate is not None:
+            masks["rate"] = catalog.filter_mask(min_rate=self.min_rate, max_rate=self.max_rate)
+        if self.min_experience is not None:
+            masks["experience"] = catalog.filter_mask(min_experience=self.min_experience)
+        if self.skills:
+            masks["skills"] = catalog.skills_mask(self.skills, match_all=self.match_all_skills)
+        if self.ids is not None:
+            masks["ids"] = catalog.ids_mask(self.ids)
+        if self.available_from is not None:
+            masks["availability"] = get_availability_store(catalog).open_mask(self.available_from, self.available_to)
+        return masks
+
+    def cache_key(self, catalog: CleanerCatalog) -> Tuple[int, Optional[int]]:
+        """Versions of the data this query's results depend on"""
+        # Only the availability filter sees bookings, so other queries survive them
+        return catalog.version, (RESERVATIONS.version if self.available_from is not None else None)
+
+    def mask(self, catalog: CleanerCatalog) -> np.ndarray:
+        """Boolean row mask of the catalog rows matching every filter"""
+        return combine_masks(self.masks(catalog).values(), len(catalog))
+
+
+def combine_masks(masks: Iterable[np.ndarray], size: int) -> np.ndarray:
+    """AND of the given row masks; all rows when there are none"""
+    result = np.ones(size, dtype=bool)
+    for mask in masks:
+        result &= mask
+    return result
+
+
+class LRUCache:
+    """Thread-safe LRU bounded by entry count and total cached rows"""
+
+    def __init__(self, max_entries: int = 256, max_rows: int = 2_000_000):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._rows = 0
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._rows -= len(old)
+            self._entries[key] = value
+            self._rows += len(value)
+            while self._entries and (len(self._entries) > self.max_entries or self._rows > self.max_rows):
+                _, evicted = self._entries.popitem(last=False)
+                self._rows -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def sync_version(self, version: int) -> None:
+        """Drop every entry once the catalog moves to a new version"""
+        with self._lock:
+            if self._version != version:
+                self._entries.clear()
+                self._rows = 0
+                self._version = version
+
+
+_RESULTS = LRUCache()
+
+
+def find_cleaners(query: CleanerQuery, catalog: Optional[CleanerCatalog] = None) -> np.ndarray:
+    """Sorted row positions matching ``query``, memoized per catalog version"""
+    catalog = catalog or get_catalog()
+    _RESULTS.sync_version(catalog.version)
+    key = (query.cache_key(catalog), query)
+    positions = _RESULTS.get(key)
+    if positions is None:
+        positions = catalog.sorted_rows(query.mask(catalog), query.sort)
+        positions.setflags(write=False)
+        _RESULTS.put(key, positions)
+    return positions
@@ -1,6 +1,4 @@
-import pandas as pd
-from datetime import datetime, timedelta
-import random
+import itertools
 
 # Sample cleaner data
 CLEANERS_DATA = [
@@ -95,26 +93,58 @@ REVIEWS_DATA = {
     ]
 }
 
+# Review-store versions: bumped per cleaner on each new review, globally on bulk reloads
+_REVIEW_VERSIONS = itertools.count(1)
+_reviews_base_version = next(_REVIEW_VERSIONS)
+_cleaner_review_versions = {}
+
 def get_cleaner_availability(cleaner_id, date):
-    """Generate random availability for a cleaner on a given date"""
-    random.seed(cleaner_id + date.day)  # Consistent availability for same date
-    
-    available_slots = []
-    base_slots = [
-        "9:00 AM", "10:00 AM", "11:00 AM", "1:00 PM", 
-        "2:00 PM", "3:00 PM", "4:00 PM", "5:00 PM"
-    ]
-    
-    # Randomly select 3-6 available slots
-    num_slots = random.randint(3, 6)
-    available_slots = random.sample(base_slots, num_slots)
-    
-    return sorted(available_slots)
+    """Open time slots for a cleaner on a given date"""
+    from .availability import get_availability_store
+    return get_availability_store().available_slots(cleaner_id, date)
 
 def get_cleaners_dataframe():
-    """Return cleaners data as pandas DataFrame"""
-    return pd.DataFrame(CLEANERS_DATA)
+    """Return cleaners data as pandas DataFrame (cached per catalog version)"""
+    from .catalog import get_catalog
+    return get_catalog().to_dataframe()
 
 def get_cleaner_reviews(cleaner_id):
     """Get reviews for a specific cleaner"""
-    return REVIEWS_DATA.get(cleaner_id, []) 
\ No newline at end of file
+    return REVIEWS_DATA.get(cleaner_id, [])
+
+def get_reviews_version(cleaner_id):
+    """Version of a cleaner's reviews; changes whenever they do"""
+    return _cleaner_review_versions.get(cleaner_id, _reviews_base_version)
+
+def get_reviews_base_version():
+    """Version of the review store as a whole; changes only when it is replaced"""
+    return _reviews_base_version
+
+def replace_reviews(reviews):
+    """Swap in a whole new review store"""
+    global REVIEWS_DATA, _reviews_base_version
+    # Rebind rather than clear and refill, so concurrent readers never see it half-loaded
+    REVIEWS_DATA = dict(reviews)
+    _cleaner_review_versions.clear()
+    _reviews_base_version = next(_REVIEW_VERSIONS)
+
+def record_review(cleaner_id, review):
+    """List a review first among the cleaner's reviews"""
+    REVIEWS_DATA.setdefault(cleaner_id, []).insert(0, review)
+    _cleaner_review_versions[cleaner_id] = next(_REVIEW_VERSIONS)
+
+def fold_rating(cleaner_id, rating):
+    """Fold one more rating into the cleaner's catalog entry"""
+    from .catalog import update_cleaner
+
+    def fold_in(cleaner):
+        total = cleaner['total_reviews'] + 1
+        average = round((cleaner['rating'] * cleaner['total_reviews'] + rating) / total, 2)
+        return {'rating': average, 'total_reviews': total}
+
+    return update_cleaner(cleaner_id, fold_in)
+
+def add_review(cleaner_id, review):
+    """Record a review and fold its rating into the cleaner's catalog entry"""
+    record_review(cleaner_id, review)
+    return fold_rating(cleaner_id, review['rating'])
@@ -0,0 +1,47 @@
+"""Opaque keyset cursors shared by the paged listings
+
+A cursor is the JSON array of the last row's position in its listing
+(sort key, id and so on), base64url-encoded without padding. Decoding
+checks every part's type, so a tampered cursor is a ``ValueError`` the
+routes turn into a 400 rather than a failure deep in a query.
+"""
+import base64
+import json
+import math
+from typing import Any, List
+
+
+MALFORMED = "Malformed cursor"
+
+
+def encode_cursor(*parts: Any) -> str:
+    """Cursor holding ``parts``, which must be JSON values"""
+    raw = json.dumps(parts, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _matches(part: Any, kind: type) -> bool:
+    if kind is object:
+        return True
+    if isinstance(part, bool):
+        return kind is bool
+    if kind is float:
+        # Any finite number; JSON writes whole floats as ints
+        return isinstance(part, (int, float)) and math.isfinite(part)
+    return isinstance(part, kind)
+
+
+def decode_cursor(cursor: str, *kinds: type) -> List[Any]:
+    """The parts of a cursor, one of each of ``kinds`` in turn; ``ValueError`` if malformed
+
+    ``float`` takes any finite number and ``object`` anything at all.
+    """
+    try:
+        parts = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise ValueError(MALFORMED)
+    if not isinstance(parts, list) or len(parts) != len(kinds):
+        raise ValueError(MALFORMED)
+    if not all(_matches(part, kind) for part, kind in zip(parts, kinds)):
+        raise ValueError(MALFORMED)
+    return parts
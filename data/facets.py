@@ -0,0 +1,82 @@
+import math
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .catalog import CleanerCatalog, get_catalog
+from .cleaner_query import CleanerQuery, LRUCache, combine_masks
+
+
+# Experience thresholds offered by the filter UI ("N+ years")
+EXPERIENCE_BUCKETS = (0, 2, 5, 7)
+RATING_EDGES = np.arange(0.0, 5.5, 0.5)
+RATE_BINS = 10
+
+_FACETS = LRUCache(max_entries=128)
+
+
+def _histogram(values: np.ndarray, edges: np.ndarray) -> list:
+    counts, _ = np.histogram(values, bins=edges)
+    return [
+        {"min": float(lo), "max": float(hi), "count": int(count)}
+        for lo, hi, count in zip(edges[:-1], edges[1:], counts)
+    ]
+
+
+def compute_facets(catalog: CleanerCatalog, query: CleanerQuery) -> Dict[str, Any]:
+    """Facet counts for a query, each facet ignoring its own filter"""
+    masks = query.masks(catalog)
+    n = len(catalog)
+
+    def without(*dims):
+        return combine_masks((m for d, m in masks.items() if d not in dims), n)
+
+    skill_mask = without("skills")
+    skill_counts = np.bincount(
+        catalog.skill_ids[skill_mask[catalog.skill_rows]], minlength=len(catalog.skill_vocab)
+    )
+    order = np.lexsort((np.arange(len(skill_counts)), -skill_counts))
+    skills = [
+        {"skill": catalog.skill_vocab[code], "count": int(skill_counts[code])}
+        for code in order
+        if skill_counts[code]
+    ]
+
+    if n:
+        lo = math.floor(catalog.hourly_rate.min())
+        hi = max(math.ceil(catalog.hourly_rate.max()), lo + 1)
+    else:
+        lo, hi = 0, 1
+    rate_edges = np.linspace(lo, hi, RATE_BINS + 1)
+    rate_mask = without("rate")
+
+    experience_mask = without("experience")
+    experience = catalog.experience_years[experience_mask]
+    thresholds = np.array(EXPERIENCE_BUCKETS)
+    experience_counts = (experience[:, None] >= thresholds[None, :]).sum(axis=0)
+
+    return {
+        "total": int(combine_masks(masks.values(), n).sum()),
+        "skills": skills,
+        "hourly_rate": {
+            "min": lo,
+            "max": hi,
+            "histogram": _histogram(catalog.hourly_rate[rate_mask], rate_edges),
+        },
+        "rating": {"histogram": _histogram(catalog.rating[without("rating")], RATING_EDGES)},
+        "experience": [
+            {"min_years": int(t), "count": int(c)} for t, c in zip(thresholds, experience_counts)
+        ],
+    }
+
+
+def cleaner_facets(query: CleanerQuery, catalog: Optional[CleanerCatalog] = None) -> Dict[str, Any]:
+    """Facet counts for a query, memoized per catalog version"""
+    catalog = catalog or get_catalog()
+    _FACETS.sync_version(catalog.version)
+    key = (query.cache_key(catalog), query._replace(sort=None))
+    facets = _FACETS.get(key)
+    if facets is None:
+        facets = compute_facets(catalog, query)
+        _FACETS.put(key, facets)
+    return facets
@@ -0,0 +1,265 @@
+"""Seeded synthetic marketplace data for local scale testing.
+
+Generate a dataset and load it into the running process::
+
+    from data.generator import generate_marketplace, load_dataset
+    load_dataset(generate_marketplace(cleaners=100_000, seed=7))
+
+or write one to a JSON file::
+
+    python -m data.generator --cleaners 100000 --out marketplace.json
+"""
+import argparse
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .availability import TIME_SLOTS
+
+FIRST_NAMES = [
+    "Sarah", "Miguel", "Emma", "David", "Lisa", "James", "Maria", "Chen", "Aisha", "Tom",
+    "Olivia", "Noah", "Sofia", "Liam", "Priya", "Lucas", "Nina", "Omar", "Grace", "Ivan",
+    "Hannah", "Mateo", "Zoe", "Kenji", "Elena", "Samuel", "Fatima", "Leo", "Chloe", "Andre",
+]
+LAST_NAMES = [
+    "Johnson", "Rodriguez", "Chen", "Thompson", "Park", "Smith", "Garcia", "Nguyen", "Khan", "Brown",
+    "Martin", "Lee", "Silva", "Walker", "Patel", "Rossi", "Kim", "Haddad", "Cohen", "Novak",
+]
+# Ordered roughly by popularity; sampling weights fall off along the list
+SKILLS = [
+    "Regular Maintenance", "Deep Cleaning", "Eco-friendly", "Pet-friendly", "Kitchen Deep Clean",
+    "Bathroom Sanitization", "Move-in/out", "Detail Cleaning", "Quick Clean", "Flexible Hours",
+    "Budget-friendly", "Own Equipment", "Same-day Service", "Insured", "Premium Service",
+    "Premium Products", "Window Cleaning", "Laundry", "Post-construction", "Luxury Cleaning",
+]
+IMAGE_URLS = [
+    "https://images.unsplash.com/photo-1494790108755-2616b612b786?w=400&h=400&fit=crop&crop=face",
+    "https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?w=400&h=400&fit=crop&crop=face",
+    "https://images.unsplash.com/photo-1438761681033-6461ffad8d80?w=400&h=400&fit=crop&crop=face",
+    "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=400&h=400&fit=crop&crop=face",
+    "https://images.unsplash.com/photo-1544005313-94ddf0286df2?w=400&h=400&fit=crop&crop=face",
+]
+REVIEW_COMMENTS = {
+    1: ["Did not show up on time.", "Left the place messier than expected."],
+    2: ["Below expectations.", "Missed several rooms."],
+    3: ["Okay job, nothing special.", "Decent but rushed."],
+    4: ["Good work, arrived on time.", "Reliable service, will book again."],
+    5: ["Amazing job! Very thorough.", "House looked brand new!", "Highly recommend!"],
+}
+BOOKING_STATUSES = ["pending", "confirmed", "completed", "cancelled"]
+APPLICATION_STATUSES = ["submitted", "under_review", "approved", "rejected"]
+STREETS = ["Main St", "Oak Ave", "Pine Rd", "Maple Dr", "Cedar Ln", "Elm St", "Park Ave", "Lake Rd"]
+
+
+def _sample_skills(rng: np.random.Generator, n: int, chunk: int = 100_000) -> List[List[str]]:
+    """2-5 distinct skills per cleaner, popularity-weighted (Gumbel top-k)"""
+    weights = 1.0 / np.arange(1, len(SKILLS) + 1) ** 0.8
+    log_p = np.log(weights / weights.sum())
+    counts = rng.integers(2, 6, size=n)
+    skills = []
+    for start in range(0, n, chunk):
+        keys = log_p + rng.gumbel(size=(min(chunk, n - start), len(SKILLS)))
+        order = np.argsort(-keys, axis=1)
+        for row, k in zip(order, counts[start:start + chunk]):
+            skills.append([SKILLS[i] for i in row[:k]])
+    return skills
+
+
+def generate_cleaners(rng: np.random.Generator, n: int) -> List[Dict[str, Any]]:
+    rates = np.clip(np.round(rng.lognormal(np.log(25), 0.25, n) * 2) / 2, 15, 60)
+    ratings = np.clip(np.round(rng.normal(4.5, 0.3, n), 1), 3.0, 5.0)
+    reviews = rng.negative_binomial(1, 0.02, n)
+    experience = np.clip(rng.poisson(4, n), 0, 30)
+    verified = rng.random(n) < 0.9
+    first = rng.integers(0, len(FIRST_NAMES), n)
+    last = rng.integers(0, len(LAST_NAMES), n)
+    skills = _sample_skills(rng, n)
+    cleaners = []
+    for i in range(n):
+        cleaner_skills = skills[i]
+        cleaners.append({
+            "id": i + 1,
+            "name": f"{FIRST_NAMES[first[i]]} {LAST_NAMES[last[i]]}",
+            "image_url": IMAGE_URLS[i % len(IMAGE_URLS)],
+            "hourly_rate": float(rates[i]),
+            "rating": float(ratings[i]),
+            "total_reviews": int(reviews[i]),
+            "bio": (
+                f"Professional cleaner with {int(experience[i])} years experience. "
+                f"Specializes in {cleaner_skills[0].lower()} and {cleaner_skills[1].lower()}."
+            ),
+            "skills": cleaner_skills,
+            "experience_years": int(experience[i]),
+            "verified": bool(verified[i]),
+        })
+    return cleaners
+
+
+def generate_reviews(
+    rng: np.random.Generator, cleaners: List[Dict[str, Any]], m: int, today: date
+) -> Dict[int, List[Dict[str, Any]]]:
+    """Reviews spread over cleaners in proportion to their review counts"""
+    if not cleaners or not m:
+        return {}
+    ids = np.array([c["id"] for c in cleaners])
+    weights = np.array([c["total_reviews"] + 1 for c in cleaners], dtype=np.float64)
+    ratings = np.array([c["rating"] for c in cleaners])
+    picks = rng.choice(len(cleaners), size=m, p=weights / weights.sum())
+    stars = np.clip(np.round(rng.normal(ratings[picks], 0.6)), 1, 5).astype(int)
+    ages = rng.integers(0, 365, m)
+    first = rng.integers(0, len(FIRST_NAMES), m)
+    last = rng.integers(0, len(LAST_NAMES), m)
+    comment_picks = rng.integers(0, 3, m)
+    reviews: Dict[int, List[Dict[str, Any]]] = {}
+    for j in np.argsort(ages, kind="stable"):
+        comments = REVIEW_COMMENTS[stars[j]]
+        reviews.setdefault(int(ids[picks[j]]), []).append({
+            "user": f"{FIRST_NAMES[first[j]]} {LAST_NAMES[last[j]][0]}.",
+            "rating": int(stars[j]),
+            "comment": comments[comment_picks[j] % len(comments)],
+            "date": (today - timedelta(days=int(ages[j]))).isoformat(),
+        })
+    return reviews
+
+
+def generate_bookings(
+    rng: np.random.Generator, cleaners: List[Dict[str, Any]], m: int, today: date
+) -> List[Dict[str, Any]]:
+    """Bookings from 60 days back to 30 days ahead, popular cleaners booked more"""
+    if not cleaners or not m:
+        return []
+    ids = np.array([c["id"] for c in cleaners])
+    weights = np.array([c["total_reviews"] + 1 for c in cleaners], dtype=np.float64)
+    picks = rng.choice(len(cleaners), size=m, p=weights / weights.sum())
+    offsets = rng.integers(-60, 31, m)
+    lead = rng.integers(1, 15, m)
+    slots = rng.integers(0, len(TIME_SLOTS), m)
+    first = rng.integers(0, len(FIRST_NAMES), m)
+    last = rng.integers(0, len(LAST_NAMES), m)
+    phones = rng.integers(2_000_000_000, 9_999_999_999, m)
+    houses = rng.integers(1, 9999, m)
+    streets = rng.integers(0, len(STREETS), m)
+    upcoming = rng.choice(2, size=m, p=[0.4, 0.6])
+    past = rng.choice(3, size=m, p=[0.05, 0.85, 0.10])
+    bookings = []
+    for j in range(m):
+        day = today + timedelta(days=int(offsets[j]))
+        if offsets[j] >= 0:
+            status = BOOKING_STATUSES[int(upcoming[j])]
+        else:
+            status = BOOKING_STATUSES[[0, 2, 3][int(past[j])]]
+        created = datetime.combine(day - timedelta(days=int(lead[j])), time(8)) + timedelta(minutes=j % 600)
+        bookings.append({
+            "id": f"CF-{j + 1:08d}",
+            "created_at": created.isoformat(),
+            "status": status,
+            "cleaner_id": int(ids[picks[j]]),
+            "customer_name": f"{FIRST_NAMES[first[j]]} {LAST_NAMES[last[j]]}",
+            "customer_phone": f"+1{int(phones[j])}",
+            "address": f"{int(houses[j])} {STREETS[streets[j]]}",
+            "date": day.isoformat(),
+            "time_slot": TIME_SLOTS[int(slots[j])],
+            "notes": None,
+        })
+    return bookings
+
+
+def generate_applications(rng: np.random.Generator, m: int, today: date) -> List[Dict[str, Any]]:
+    if not m:
+        return []
+    first = rng.integers(0, len(FIRST_NAMES), m)
+    last = rng.integers(0, len(LAST_NAMES), m)
+    ages = rng.integers(18 * 365, 60 * 365, m)
+    experience = np.clip(rng.poisson(3, m), 0, 50)
+    statuses = rng.choice(len(APPLICATION_STATUSES), size=m, p=[0.5, 0.2, 0.2, 0.1])
+    phones = rng.integers(2_000_000_000, 9_999_999_999, m)
+    submitted = rng.integers(0, 90, m)
+    skills = _sample_skills(rng, m)
+    applications = []
+    for j in range(m):
+        first_name, last_name = FIRST_NAMES[first[j]], LAST_NAMES[last[j]]
+        applications.append({
+            "id": f"APP-{j + 1:08d}",
+            "created_at": datetime.combine(today - timedelta(days=int(submitted[j])), time(12)).isoformat(),
+            "status": APPLICATION_STATUSES[int(statuses[j])],
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": f"{first_name.lower()}.{last_name.lower()}{j + 1}@example.com",
+            "phone": f"+1{int(phones[j])}",
+            "dob": (today - timedelta(days=int(ages[j]))).isoformat(),
+            "experience_years": int(experience[j]),
+            "skills": skills[j],
+            "bio": None,
+            "facebook_profile": None,
+        })
+    return applications
+
+
+def generate_marketplace(
+    cleaners: int = 1000,
+    reviews: Optional[int] = None,
+    bookings: Optional[int] = None,
+    applications: Optional[int] = None,
+    seed: int = 0,
+    today: Optional[date] = None,
+) -> Dict[str, Any]:
+    """Deterministic marketplace dataset; the same arguments always give the same data"""
+    today = today or date.today()
+    rng = np.random.default_rng(seed)
+    reviews = cleaners * 3 if reviews is None else reviews
+    bookings = cleaners * 2 if bookings is None else bookings
+    applications = max(1, cleaners // 10) if applications is None else applications
+    cleaner_rows = generate_cleaners(rng, cleaners)
+    return {
+        "cleaners": cleaner_rows,
+        "reviews": generate_reviews(rng, cleaner_rows, reviews, today),
+        "bookings": generate_bookings(rng, cleaner_rows, bookings, today),
+        "applications": generate_applications(rng, applications, today),
+    }
+
+
+def load_dataset(dataset: Dict[str, Any]) -> None:
+    """Replace the catalog and reviews in process, and the stored bookings and applications, in bulk"""
+    from backend.routers.applications import CleanerApplication, applications_repository
+    from backend.routers.bookings import Booking, bookings_repository, sync_reservations
+    from .catalog import rebuild_catalog
+    from .cleaners_data import CLEANERS_DATA, replace_reviews
+    from .similarity import warm_similarity
+
+    CLEANERS_DATA[:] = dataset["cleaners"]
+    # Ids are reused across datasets, so neighbours from the old one must not be served meanwhile
+    warm_similarity(rebuild_catalog(CLEANERS_DATA))
+    replace_reviews({int(k): v for k, v in dataset["reviews"].items()})
+    bookings = [Booking(**b) for b in dataset["bookings"]]
+    bookings_repository().replace_all(bookings)
+    # Generated bookings ignore availability; clashing ones get no claims but still mark their slots
+    sync_reservations(full=True)
+    applications_repository().replace_all(CleanerApplication(**a) for a in dataset["applications"])
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic CleanFee marketplace dataset")
+    parser.add_argument("--cleaners", type=int, default=1000)
+    parser.add_argument("--reviews", type=int, default=None, help="default: 3 per cleaner")
+    parser.add_argument("--bookings", type=int, default=None, help="default: 2 per cleaner")
+    parser.add_argument("--applications", type=int, default=None, help="default: 1 per 10 cleaners")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--today", type=date.fromisoformat, default=None, help="anchor date (YYYY-MM-DD)")
+    parser.add_argument("--out", required=True, help="output JSON path")
+    args = parser.parse_args(argv)
+    dataset = generate_marketplace(
+        cleaners=args.cleaners,
+        reviews=args.reviews,
+        bookings=args.bookings,
+        applications=args.applications,
+        seed=args.seed,
+        today=args.today,
+    )
+    with open(args.out, "w") as f:
+        json.dump(dataset, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Time-ordered, collision-free ids for bookings, applications and the like.
+
+Each id packs a millisecond timestamp, a worker number and a per-millisecond
+sequence into 63 bits (the "snowflake" layout), rendered as 13 Crockford
+base32 characters so ids sort by creation time as plain strings::
+
+    new_id("CF-")  # 'CF-0A8TVZ3C8MW00'
+
+Each process leases its worker number: it holds a lock on one file per
+number under ``CLEANFEE_WORKER_LOCK_DIR`` for as long as it runs, taking the
+lowest free number in ``CLEANFEE_WORKER_IDS`` (default ``0-1023``). So the
+uvicorn workers and the Streamlit app on one host never share a number, and
+hosts writing to the same store are given disjoint ranges.
+"""
+import os
+import tempfile
+import threading
+import time
+from typing import IO, Callable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+WORKER_IDS_ENV = "CLEANFEE_WORKER_IDS"
+WORKER_LOCK_DIR_ENV = "CLEANFEE_WORKER_LOCK_DIR"
+# 2024-01-01T00:00:00Z; 41 bits of milliseconds from here last until 2093
+EPOCH_MS = 1_704_067_200_000
+
+TIMESTAMP_BITS = 41
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_ENCODED_LENGTH = 13
+
+
+# Lock file of the worker number this process holds; kept open until the process exits
+_LEASE: Optional[IO] = None
+
+
+def worker_id_range() -> Tuple[int, int]:
+    """First and last worker number this host may lease, from ``CLEANFEE_WORKER_IDS``"""
+    configured = os.getenv(WORKER_IDS_ENV, f"0-{MAX_WORKER_ID}")
+    try:
+        first, _, last = configured.partition("-")
+        first, last = int(first), int(last or first)
+    except ValueError:
+        raise ValueError(f"{WORKER_IDS_ENV} must be a number or a range like 0-63, not {configured!r}")
+    if not 0 <= first <= last <= MAX_WORKER_ID:
+        raise ValueError(f"{WORKER_IDS_ENV} must lie within 0-{MAX_WORKER_ID}")
+    return first, last
+
+
+def _try_lock(f: IO) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def lease_worker_id() -> int:
+    """Lock the lowest free worker number in range for the rest of this process's life"""
+    global _LEASE
+    directory = os.getenv(WORKER_LOCK_DIR_ENV) or os.path.join(tempfile.gettempdir(), "cleanfee-workers")
+    os.makedirs(directory, exist_ok=True)
+    first, last = worker_id_range()
+    for worker_id in range(first, last + 1):
+        f = open(os.path.join(directory, f"worker-{worker_id}.lock"), "a+b")
+        if _try_lock(f):
+            # The lock goes away with the process, even if it crashes
+            _LEASE = f
+            return worker_id
+        f.close()
+    raise RuntimeError(f"All worker ids {first}-{last} in {directory} are taken; widen {WORKER_IDS_ENV}")
+
+
+def encode(value: int) -> str:
+    """Fixed-width Crockford base32, so string order matches numeric order"""
+    chars = []
+    for _ in range(_ENCODED_LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(_ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+class IdGenerator:
+    """Thread-safe generator of monotonically increasing 63-bit ids"""
+
+    def __init__(self, worker_id: Optional[int] = None, clock: Callable[[], int] = time.time_ns):
+        self.worker_id = lease_worker_id() if worker_id is None else worker_id
+        if not 0 <= self.worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _now_ms(self) -> int:
+        return self._clock() // 1_000_000 - EPOCH_MS
+
+    def next_int(self) -> int:
+        with self._lock:
+            # Never behind the last id, even if the wall clock steps back
+            now = max(self._now_ms(), self._last_ms)
+            if now == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # 4096 ids this millisecond already: borrow the next one rather than wait
+                    now += 1
+            else:
+                self._sequence = 0
+            self._last_ms = now
+            return (now << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker_id << SEQUENCE_BITS) | self._sequence
+
+    def next_id(self, prefix: str = "") -> str:
+        return prefix + encode(self.next_int())
+
+
+_GENERATOR: Optional[IdGenerator] = None
+_GENERATOR_LOCK = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    # A forked worker must not reuse its parent's worker id and sequence; it leases its own.
+    # Its copy of the parent's lock file stays open, so that id stays taken while either runs
+    global _GENERATOR, _GENERATOR_LOCK, _LEASE
+    _GENERATOR = None
+    _GENERATOR_LOCK = threading.Lock()
+    _LEASE = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def new_id(prefix: str = "") -> str:
+    """Next id from this process's generator, e.g. ``new_id("CF-")`` for a booking"""
+    global _GENERATOR
+    generator = _GENERATOR
+    if generator is None:
+        with _GENERATOR_LOCK:
+            if _GENERATOR is None:
+                _GENERATOR = IdGenerator()
+            generator = _GENERATOR
+    return generator.next_id(prefix)
@@ -0,0 +1,122 @@
+"""Load the cleaner catalog from a JSON data file and hot-reload it on change.
+
+The file is either a bare list of cleaner records or a dataset object with a
+``cleaners`` list and an optional ``reviews`` mapping (the format written by
+``python -m data.generator``). Point ``CLEANFEE_CATALOG_PATH`` at it and the
+API and Streamlit app pick up edits without a restart: each change is built
+into a complete new catalog off the request path and swapped in at once, so
+requests already holding the previous snapshot finish against it.
+"""
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .catalog import CleanerCatalog, publish_catalog
+
+
+CATALOG_PATH_ENV = "CLEANFEE_CATALOG_PATH"
+RELOAD_INTERVAL_ENV = "CLEANFEE_RELOAD_INTERVAL"
+DEFAULT_RELOAD_INTERVAL = 2.0
+
+logger = logging.getLogger(__name__)
+
+
+def read_catalog_file(path: str) -> Tuple[List[Dict[str, Any]], Optional[Dict[int, List[Dict[str, Any]]]]]:
+    """Cleaner records and, when the file has them, reviews by cleaner id"""
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return data, None
+    reviews = data.get("reviews")
+    if reviews is not None:
+        reviews = {int(cleaner_id): items for cleaner_id, items in reviews.items()}
+    return data["cleaners"], reviews
+
+
+def load_catalog_file(path: str) -> CleanerCatalog:
+    """Build a warmed catalog from ``path`` and make it current"""
+    from . import cleaners_data
+    from .availability import get_availability_store
+    from .ranking import ranked
+    from .similarity import warm_similarity
+
+    cleaners, reviews = read_catalog_file(path)
+    catalog = CleanerCatalog(cleaners)
+    catalog.warm()
+    publish_catalog(catalog)
+    if reviews is not None:
+        cleaners_data.replace_reviews(reviews)
+    # Keeps rebuild_catalog() (no arguments) consistent with the published data
+    cleaners_data.CLEANERS_DATA[:] = catalog.records
+    # Version-keyed caches hold one version, so fill them only once this one is live
+    ranked(catalog)
+    warm_similarity(catalog)
+    get_availability_store(catalog)
+    return catalog
+
+
+class CatalogReloader(threading.Thread):
+    """Daemon thread reloading the catalog whenever its data file changes"""
+
+    def __init__(self, path: str, interval: float = DEFAULT_RELOAD_INTERVAL):
+        super().__init__(name="catalog-reloader", daemon=True)
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._signature: Optional[Tuple[int, int]] = None
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_if_changed(self) -> bool:
+        """Load the file if it changed since the last load; a bad file keeps the current catalog"""
+        signature = self._file_signature()
+        if signature is None or signature == self._signature:
+            return False
+        try:
+            catalog = load_catalog_file(self.path)
+        except Exception:
+            logger.exception("Catalog reload from %s failed; keeping the current catalog", self.path)
+            return False
+        finally:
+            # Don't retry an unchanged broken file every interval
+            self._signature = signature
+        logger.info("Loaded %d cleaners from %s (version %d)", len(catalog), self.path, catalog.version)
+        return True
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.reload_if_changed()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+_RELOADER: Optional[CatalogReloader] = None
+_RELOADER_LOCK = threading.Lock()
+
+
+def start_catalog_reloader(path: Optional[str] = None, interval: Optional[float] = None) -> Optional[CatalogReloader]:
+    """Load the catalog file and start watching it; ``None`` when no file is configured
+
+    Idempotent per process, so the Streamlit script can call it on every rerun.
+    """
+    global _RELOADER
+    path = path or os.getenv(CATALOG_PATH_ENV)
+    if not path:
+        return None
+    with _RELOADER_LOCK:
+        if _RELOADER is None:
+            if interval is None:
+                interval = float(os.getenv(RELOAD_INTERVAL_ENV, DEFAULT_RELOAD_INTERVAL))
+            reloader = CatalogReloader(path, interval)
+            reloader.reload_if_changed()
+            reloader.start()
+            _RELOADER = reloader
+    return _RELOADER
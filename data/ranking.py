@@ -0,0 +1,63 @@
+import threading
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .catalog import CleanerCatalog
+
+
+class RankingWeights(NamedTuple):
+    """Tuning knobs for the relevance score"""
+
+    # Pseudo-reviews at the catalog mean rating added to every cleaner
+    prior_reviews: float = 10.0
+    verified_boost: float = 0.1
+    # Added in full at ``experience_cap`` years, linearly below that
+    experience_boost: float = 0.1
+    experience_cap: int = 10
+
+
+DEFAULT_WEIGHTS = RankingWeights()
+
+
+def bayesian_rating(rating: np.ndarray, reviews: np.ndarray, prior_mean: float, prior_reviews: float) -> np.ndarray:
+    """Ratings shrunk toward ``prior_mean``, less so the more reviews back them"""
+    reviews = reviews.astype(np.float64)
+    return (rating * reviews + prior_mean * prior_reviews) / (reviews + prior_reviews)
+
+
+def relevance_scores(catalog: "CleanerCatalog", weights: RankingWeights = DEFAULT_WEIGHTS) -> np.ndarray:
+    """Relevance score per catalog row, higher is better"""
+    reviews = catalog.total_reviews
+    total = reviews.sum()
+    if total:
+        prior_mean = float((catalog.rating * reviews).sum() / total)
+    else:
+        prior_mean = float(catalog.rating.mean()) if len(catalog) else 0.0
+    scores = bayesian_rating(catalog.rating, reviews, prior_mean, weights.prior_reviews)
+    scores += weights.verified_boost * catalog.verified
+    if weights.experience_cap > 0:
+        experience = np.minimum(catalog.experience_years, weights.experience_cap) / weights.experience_cap
+        scores += weights.experience_boost * experience
+    return scores
+
+
+_RANKED: Optional[Tuple[int, np.ndarray, np.ndarray]] = None
+_RANKED_LOCK = threading.Lock()
+
+
+def ranked(catalog: "CleanerCatalog") -> Tuple[np.ndarray, np.ndarray]:
+    """Relevance scores and the row order by descending score (ties by id), per catalog version"""
+    global _RANKED
+    cached = _RANKED
+    if cached is not None and cached[0] == catalog.version:
+        return cached[1], cached[2]
+    with _RANKED_LOCK:
+        version = catalog.version
+        scores = relevance_scores(catalog)
+        order = np.lexsort((catalog.ids, -scores))
+        scores.setflags(write=False)
+        order.setflags(write=False)
+        _RANKED = (version, scores, order)
+    return scores, order
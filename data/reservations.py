@@ -0,0 +1,74 @@
+import itertools
+import threading
+from contextlib import ExitStack, contextmanager
+from datetime import date
+from typing import Dict, Iterable, Iterator, Tuple
+
+
+class SlotConflict(Exception):
+    """The requested slots are not (or no longer) open"""
+
+
+class ReservationBook:
+    """Booked-slot bitmaps per (day, cleaner), written under per-cleaner striped locks
+
+    Checking and reserving a slot range is a couple of bitmask operations, so a
+    booking only ever contends with bookings for cleaners on the same stripe.
+    """
+
+    def __init__(self, stripes: int = 64):
+        self._days: Dict[date, Dict[int, int]] = {}
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._versions = itertools.count(1)
+        self.version = next(self._versions)
+
+    def lock_for(self, cleaner_id: int) -> threading.Lock:
+        return self._locks[cleaner_id % len(self._locks)]
+
+    @contextmanager
+    def all_locks(self) -> Iterator[None]:
+        """Hold every stripe, e.g. while rebuilding a view of the whole book"""
+        with ExitStack() as stack:
+            for lock in self._locks:
+                stack.enter_context(lock)
+            yield
+
+    def booked_bits(self, cleaner_id: int, day: date) -> int:
+        return self._days.get(day, {}).get(cleaner_id, 0)
+
+    def day(self, day: date) -> Dict[int, int]:
+        """Cleaner id -> booked bits on ``day``; treat as read-only"""
+        return self._days.get(day, {})
+
+    def mark(self, cleaner_id: int, day: date, bits: int) -> None:
+        """Record booked bits; the caller holds the cleaner's stripe lock"""
+        booked = self._days.setdefault(day, {})
+        booked[cleaner_id] = booked.get(cleaner_id, 0) | bits
+        self.version = next(self._versions)
+
+    def unmark(self, cleaner_id: int, day: date, bits: int) -> None:
+        """Forget booked bits; the caller holds the cleaner's stripe lock"""
+        booked = self._days.get(day, {})
+        remaining = booked.get(cleaner_id, 0) & ~bits
+        if remaining:
+            booked[cleaner_id] = remaining
+        else:
+            booked.pop(cleaner_id, None)
+        self.version = next(self._versions)
+
+    def items(self) -> Iterator[Tuple[date, int, int]]:
+        for day, booked in list(self._days.items()):
+            for cleaner_id, bits in list(booked.items()):
+                yield day, cleaner_id, bits
+
+    def replace(self, holds: Iterable[Tuple[int, date, int]]) -> None:
+        """Swap the whole book for (cleaner, day, bits) holds; the caller holds every stripe"""
+        days: Dict[date, Dict[int, int]] = {}
+        for cleaner_id, day, bits in holds:
+            booked = days.setdefault(day, {})
+            booked[cleaner_id] = booked.get(cleaner_id, 0) | bits
+        self._days = days
+        self.version = next(self._versions)
+
+
+RESERVATIONS = ReservationBook()
@@ -0,0 +1,178 @@
+import logging
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .catalog import CleanerCatalog, get_catalog
+
+
+logger = logging.getLogger(__name__)
+
+# Neighbours kept per cleaner; requests may ask for at most this many
+MAX_NEIGHBOURS = 20
+# Rows scored against the whole catalog per matrix product, bounding peak memory
+BATCH_ROWS = 1024
+# Weight of the rate and experience columns relative to one skill
+RATE_WEIGHT = 1.0
+EXPERIENCE_WEIGHT = 1.0
+
+
+def _standardized(values: np.ndarray) -> np.ndarray:
+    values = values.astype(np.float32)
+    std = values.std()
+    return (values - values.mean()) / std if std else np.zeros_like(values)
+
+
+def feature_matrix(catalog: CleanerCatalog) -> np.ndarray:
+    """Row-normalized skill one-hot, rate and experience features per catalog row"""
+    n = len(catalog)
+    features = np.zeros((n, len(catalog.skill_vocab) + 2), dtype=np.float32)
+    features[catalog.skill_rows, catalog.skill_ids] = 1.0
+    features[:, -2] = RATE_WEIGHT * _standardized(catalog.hourly_rate)
+    features[:, -1] = EXPERIENCE_WEIGHT * _standardized(catalog.experience_years)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    np.divide(features, norms, out=features, where=norms > 0)
+    return features
+
+
+def _top_k_rows(features: np.ndarray, start: int, stop: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    sims = features[start:stop] @ features.T
+    sims[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    top_sims = np.take_along_axis(sims, top, axis=1)
+    # Best first, ties by row position so results are stable
+    order = np.lexsort((top, -top_sims), axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_sims, order, axis=1)
+
+
+def top_k_neighbours(features: np.ndarray, k: int = MAX_NEIGHBOURS) -> Tuple[np.ndarray, np.ndarray]:
+    """Each row's ``k`` most cosine-similar other rows, best first, with their scores"""
+    n = len(features)
+    k = min(k, max(n - 1, 0))
+    neighbours = np.empty((n, k), dtype=np.int64)
+    scores = np.empty((n, k), dtype=np.float32)
+    if not k:
+        return neighbours, scores
+    for start in range(0, n, BATCH_ROWS):
+        stop = min(start + BATCH_ROWS, n)
+        neighbours[start:stop], scores[start:stop] = _top_k_rows(features, start, stop, k)
+    return neighbours, scores
+
+
+class _Neighbours:
+    """Top-k neighbours of every row of one catalog version, by row position"""
+
+    def __init__(
+        self,
+        version: int,
+        ids: np.ndarray,
+        features: np.ndarray,
+        neighbours: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ):
+        self.version = version
+        self.ids = ids
+        self.features = features
+        self.neighbours, self.scores = neighbours or top_k_neighbours(features)
+
+
+def _next_table(table: Optional[_Neighbours], catalog: CleanerCatalog) -> _Neighbours:
+    ids, features = catalog.ids, feature_matrix(catalog)
+    if table is not None and np.array_equal(table.ids, ids) and np.array_equal(table.features, features):
+        # Ratings and reviews changed but no feature did: keep the neighbours
+        return _Neighbours(catalog.version, ids, features, (table.neighbours, table.scores))
+    return _Neighbours(catalog.version, ids, features)
+
+
+_NEIGHBOURS: Optional[_Neighbours] = None
+_NEIGHBOURS_LOCK = threading.Lock()
+# Newest catalog still waiting for its table, and whether a rebuild thread is running
+_PENDING: Optional[CleanerCatalog] = None
+_REBUILDING = False
+
+
+def _rebuild_loop() -> None:
+    global _NEIGHBOURS, _PENDING, _REBUILDING
+    while True:
+        with _NEIGHBOURS_LOCK:
+            catalog, _PENDING = _PENDING, None
+            if catalog is None:
+                _REBUILDING = False
+                return
+        try:
+            table = _next_table(_NEIGHBOURS, catalog)
+        except Exception:
+            logger.exception("Rebuilding the neighbour table for catalog version %d failed", catalog.version)
+            continue
+        with _NEIGHBOURS_LOCK:
+            if _NEIGHBOURS is None or table.version > _NEIGHBOURS.version:
+                _NEIGHBOURS = table
+
+
+def _neighbour_table(catalog: CleanerCatalog) -> _Neighbours:
+    """The table for ``catalog``, or the previous one while a rebuild runs in the background
+
+    Only the very first table is built in the caller's thread.
+    """
+    global _NEIGHBOURS, _PENDING, _REBUILDING
+    table = _NEIGHBOURS
+    if table is not None and table.version >= catalog.version:
+        return table
+    with _NEIGHBOURS_LOCK:
+        if _NEIGHBOURS is None:
+            _NEIGHBOURS = _next_table(None, catalog)
+            return _NEIGHBOURS
+        table = _NEIGHBOURS
+        if table.version >= catalog.version:
+            return table
+        if _PENDING is None or _PENDING.version < catalog.version:
+            _PENDING = catalog
+        if not _REBUILDING:
+            _REBUILDING = True
+            threading.Thread(target=_rebuild_loop, name="similarity-rebuild", daemon=True).start()
+    return table
+
+
+def warm_similarity(catalog: CleanerCatalog) -> None:
+    """Compute the neighbour table for ``catalog`` ahead of the first request"""
+    global _NEIGHBOURS
+    with _NEIGHBOURS_LOCK:
+        table = _NEIGHBOURS
+        if table is None or table.version < catalog.version:
+            _NEIGHBOURS = _next_table(table, catalog)
+
+
+def similarity_version(catalog: Optional[CleanerCatalog] = None) -> int:
+    """Catalog version the neighbours served for ``catalog`` were computed from"""
+    return _neighbour_table(catalog or get_catalog()).version
+
+
+def similar_cleaners(
+    cleaner_id: int, limit: int = 5, catalog: Optional[CleanerCatalog] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Row positions of the cleaners most similar to ``cleaner_id`` and their cosine scores"""
+    catalog = catalog or get_catalog()
+    pos = catalog.position(cleaner_id)
+    if pos is None:
+        raise KeyError(cleaner_id)
+    table = _neighbour_table(catalog)
+    if table.ids is catalog.ids:
+        return table.neighbours[pos, :limit], table.scores[pos, :limit]
+
+    # The table is from an older version: map its rows to this one by id
+    rows = np.flatnonzero(table.ids == cleaner_id)
+    if not len(rows):
+        # Too new for the table: score just this row against the current catalog
+        features = feature_matrix(catalog)
+        k = min(MAX_NEIGHBOURS, len(features) - 1)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        neighbours, scores = _top_k_rows(features, pos, pos + 1, k)
+        return neighbours[0, :limit], scores[0, :limit]
+    positions, scores = [], []
+    for neighbour_id, score in zip(table.ids[table.neighbours[rows[0]]], table.scores[rows[0]]):
+        neighbour = catalog.position(int(neighbour_id))
+        if neighbour is not None:
+            positions.append(neighbour)
+            scores.append(score)
+    return np.array(positions[:limit], dtype=np.int64), np.array(scores[:limit], dtype=np.float32)
@@ -0,0 +1,60 @@
+from typing import Iterable, List
+
+import numpy as np
+
+
+class SkillIndex:
+    """Packed bitmap per skill code over catalog row positions"""
+
+    def __init__(self, rows: np.ndarray, codes: np.ndarray, n_skills: int, size: int):
+        self._size = size
+        self._capacity = max(8, (size + 7) // 8)
+        self._bitmaps: List[np.ndarray] = []
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(n_skills + 1))
+        for code in range(n_skills):
+            mask = np.zeros(self._capacity * 8, dtype=bool)
+            mask[rows[order[bounds[code]:bounds[code + 1]]]] = True
+            self._bitmaps.append(np.packbits(mask, bitorder="little"))
+
+    def copy(self) -> "SkillIndex":
+        index = SkillIndex.__new__(SkillIndex)
+        index._size = self._size
+        index._capacity = self._capacity
+        index._bitmaps = [bitmap.copy() for bitmap in self._bitmaps]
+        return index
+
+    def add(self, pos: int, codes: Iterable[int]) -> None:
+        """Set the bits for a (possibly new) row position"""
+        if pos >= self._capacity * 8:
+            grow = max(self._capacity, (pos - self._capacity * 8) // 8 + 1)
+            self._bitmaps = [np.concatenate([b, np.zeros(grow, dtype=np.uint8)]) for b in self._bitmaps]
+            self._capacity += grow
+        self._size = max(self._size, pos + 1)
+        for code in codes:
+            while code >= len(self._bitmaps):
+                self._bitmaps.append(np.zeros(self._capacity, dtype=np.uint8))
+            self._bitmaps[code][pos >> 3] |= np.uint8(1 << (pos & 7))
+
+    def remove(self, pos: int, codes: Iterable[int]) -> None:
+        """Clear the bits of a row position"""
+        for code in codes:
+            self._bitmaps[code][pos >> 3] &= np.uint8(~(1 << (pos & 7)) & 0xFF)
+
+    def any_of(self, codes: Iterable[int]) -> np.ndarray:
+        """Bitmap OR over the given skill codes"""
+        bitmaps = [self._bitmaps[c] for c in codes if c < len(self._bitmaps)]
+        if not bitmaps:
+            return np.zeros(self._capacity, dtype=np.uint8)
+        return np.bitwise_or.reduce(bitmaps)
+
+    def all_of(self, codes: Iterable[int]) -> np.ndarray:
+        """Bitmap AND over the given skill codes"""
+        codes = list(codes)
+        if any(c >= len(self._bitmaps) for c in codes):
+            return np.zeros(self._capacity, dtype=np.uint8)
+        return np.bitwise_and.reduce([self._bitmaps[c] for c in codes])
+
+    def to_mask(self, bitmap: np.ndarray) -> np.ndarray:
+        """Unpack a bitmap into a boolean row mask"""
+        return np.unpackbits(bitmap, count=self._size, bitorder="little").view(bool)
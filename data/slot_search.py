@@ -0,0 +1,90 @@
+import heapq
+from datetime import date, datetime, timedelta
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from .availability import SLOT_HOURS, TIME_SLOTS, AvailabilityStore, get_availability_store, start_bits
+from .catalog import CleanerCatalog, get_catalog
+from .ranking import ranked
+
+
+# Lowest set bit of each uint8 value (8 for zero)
+_LOWEST_BIT = np.array([(v & -v).bit_length() - 1 if v else 8 for v in range(256)], dtype=np.int64)
+_SLOT_MINUTES = np.array([hour * 60 for hour in SLOT_HOURS])
+
+
+class SlotMatch(NamedTuple):
+    cleaner_id: int
+    date: date
+    time_slot: str
+
+
+def earliest_slots(
+    mask: np.ndarray,
+    duration: int,
+    limit: int,
+    not_before: Optional[datetime] = None,
+    catalog: Optional[CleanerCatalog] = None,
+    store: Optional[AvailabilityStore] = None,
+) -> List[SlotMatch]:
+    """The ``limit`` earliest bookable starts among the catalog rows in ``mask``
+
+    Ordered by start time, then by relevance. Each cleaner's starts form an
+    ordered stream; the streams are merged through a heap, and only the
+    cleaners actually picked are advanced, so the search ends after ``limit``.
+    """
+    catalog = catalog or get_catalog()
+    store = store or get_availability_store(catalog)
+    not_before = not_before or datetime.now()
+    first_col = store.day_index(not_before.date())
+    if first_col is None or limit <= 0:
+        return []
+
+    rows = np.flatnonzero(mask)
+    starts = start_bits(store.bits[rows, first_col:], duration)
+    # Nothing that starts before ``not_before`` on its own day
+    minutes = not_before.hour * 60 + not_before.minute + (not_before.second > 0)
+    late = (_SLOT_MINUTES >= minutes) << np.arange(len(TIME_SLOTS))
+    starts[:, 0] &= np.uint8(late.sum())
+
+    has_start = starts != 0
+    keep = has_start.any(axis=1)
+    rows, starts, has_start = rows[keep], starts[keep], has_start[keep]
+    first_day = has_start.argmax(axis=1)
+    first_slot = _LOWEST_BIT[starts[np.arange(len(rows)), first_day]]
+    rank = np.empty(len(catalog), dtype=np.int64)
+    rank[ranked(catalog)[1]] = np.arange(len(catalog))
+    rows_rank = rank[rows]
+
+    # Cleaners in order of their first start; a cleaner re-enters through the heap
+    # with its next start only after being picked, so the heap stays at most ``limit`` long
+    order = np.lexsort((rows_rank, first_slot, first_day))
+    heap: List[tuple] = []
+    matches: List[SlotMatch] = []
+    p = 0
+    while len(matches) < limit and (heap or p < len(order)):
+        if p < len(order):
+            i = int(order[p])
+            candidate = (int(first_day[i]), int(first_slot[i]), int(rows_rank[i]), i)
+            if not heap or candidate < heap[0]:
+                p += 1
+            else:
+                candidate = heapq.heappop(heap)
+        else:
+            candidate = heapq.heappop(heap)
+        day, slot, row_rank, i = candidate
+        matches.append(SlotMatch(
+            int(catalog.ids[rows[i]]),
+            store.start + timedelta(days=first_col + day),
+            TIME_SLOTS[slot],
+        ))
+        later = int(starts[i, day]) >> (slot + 1)
+        if later:
+            heapq.heappush(heap, (day, slot + 1 + int(_LOWEST_BIT[later]), row_rank, i))
+            continue
+        ahead = has_start[i, day + 1:]
+        if ahead.any():
+            next_day = day + 1 + int(ahead.argmax())
+            heapq.heappush(heap, (next_day, int(_LOWEST_BIT[starts[i, next_day]]), row_rank, i))
+    return matches
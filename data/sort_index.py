@@ -0,0 +1,59 @@
+from typing import Any, Tuple
+
+import numpy as np
+
+
+class SortIndex:
+    """Catalog row order by (key, id), kept sorted under point updates
+
+    Holds the row positions, keys and ids in sorted order as arrays. A changed
+    rating or rate finds its old and new places by binary search and moves
+    one entry, a memmove rather than a re-sort. Every change builds new
+    arrays, so the arrays a reader got from ``arrays`` never change and
+    copies can share them.
+    """
+
+    def __init__(self, keys: np.ndarray, ids: np.ndarray):
+        perm = np.lexsort((ids, keys))
+        self._arrays: Tuple[np.ndarray, np.ndarray, np.ndarray] = (perm, keys[perm], ids[perm])
+
+    def copy(self) -> "SortIndex":
+        index = SortIndex.__new__(SortIndex)
+        index._arrays = self._arrays
+        return index
+
+    def __len__(self) -> int:
+        return len(self._arrays[0])
+
+    def _place(self, key: Any, cleaner_id: int) -> int:
+        # Where (key, id) is, or would go, in the sorted order
+        _, keys, ids = self._arrays
+        lo = np.searchsorted(keys, key, side="left")
+        hi = np.searchsorted(keys, key, side="right")
+        return int(lo + np.searchsorted(ids[lo:hi], cleaner_id))
+
+    def add(self, pos: int, key: Any, cleaner_id: int) -> None:
+        at = self._place(key, cleaner_id)
+        perm, keys, ids = self._arrays
+        self._arrays = (np.insert(perm, at, pos), np.insert(keys, at, key), np.insert(ids, at, cleaner_id))
+
+    def update(self, pos: int, old_key: Any, new_key: Any, cleaner_id: int) -> None:
+        """Move one row from ``old_key`` to ``new_key``"""
+        if old_key == new_key:
+            return
+        old_at, new_at = self._place(old_key, cleaner_id), self._place(new_key, cleaner_id)
+        perm, keys, ids = (a.copy() for a in self._arrays)
+        # Shift the entries in between by one and drop the row into the gap
+        if new_at > old_at:
+            new_at -= 1
+            for a in (perm, keys, ids):
+                a[old_at:new_at] = a[old_at + 1:new_at + 1]
+        else:
+            for a in (perm, keys, ids):
+                a[new_at + 1:old_at + 1] = a[new_at:old_at]
+        perm[new_at], keys[new_at], ids[new_at] = pos, new_key, cleaner_id
+        self._arrays = (perm, keys, ids)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Row positions, keys and ids in sorted order"""
+        return self._arrays
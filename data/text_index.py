@@ -0,0 +1,123 @@
+import bisect
+import copy
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of a piece of text"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class TextIndex:
+    """Inverted token index with prefix matching over catalog rows
+
+    The bulk-built base keeps one sorted vocabulary and a single posting
+    array grouped by token, so every token sharing a prefix is one
+    contiguous slice. Rows added or changed afterwards go to a small delta
+    index and shadow their base postings until the delta grows large
+    enough to be compacted into a new base.
+    """
+
+    def __init__(self, docs: Iterable[str] = ()):
+        self._docs: List[List[str]] = []
+        self._vocab: List[str] = []
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._postings = np.zeros(0, dtype=np.int64)
+        self._base_alive = np.zeros(0, dtype=bool)
+        self._delta: Dict[str, Set[int]] = {}
+        self._delta_vocab: List[str] = []
+        self._delta_rows: Set[int] = set()
+        self._build([sorted(set(tokenize(d))) for d in docs])
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def copy(self) -> "TextIndex":
+        """Independent copy; the bulk-built base arrays are shared since they are only ever replaced"""
+        index = copy.copy(self)
+        index._docs = list(self._docs)
+        index._base_alive = self._base_alive.copy()
+        index._delta = {token: set(rows) for token, rows in self._delta.items()}
+        index._delta_vocab = list(self._delta_vocab)
+        index._delta_rows = set(self._delta_rows)
+        return index
+
+    def _build(self, docs: List[List[str]]) -> None:
+        self._docs = docs
+        vocab = sorted({t for tokens in docs for t in tokens})
+        codes = {t: i for i, t in enumerate(vocab)}
+        counts = [len(tokens) for tokens in docs]
+        token_codes = np.fromiter((codes[t] for tokens in docs for t in tokens), dtype=np.int64, count=sum(counts))
+        doc_ids = np.repeat(np.arange(len(docs), dtype=np.int64), counts)
+        order = np.lexsort((doc_ids, token_codes))
+        self._vocab = vocab
+        self._postings = doc_ids[order]
+        self._offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(token_codes, minlength=len(vocab)), out=self._offsets[1:])
+        self._base_alive = np.ones(len(docs), dtype=bool)
+        self._delta = {}
+        self._delta_vocab = []
+        self._delta_rows = set()
+
+    def add(self, text: str) -> int:
+        """Index a new row and return its position"""
+        self._docs.append([])
+        pos = len(self._docs) - 1
+        self.update(pos, text)
+        return pos
+
+    def update(self, pos: int, text: str) -> None:
+        """Re-index the row at ``pos`` with new text"""
+        if pos < len(self._base_alive):
+            self._base_alive[pos] = False
+        for token in self._docs[pos]:
+            postings = self._delta.get(token)
+            if postings is not None:
+                postings.discard(pos)
+        tokens = sorted(set(tokenize(text)))
+        self._docs[pos] = tokens
+        for token in tokens:
+            if token not in self._delta:
+                bisect.insort(self._delta_vocab, token)
+                self._delta[token] = set()
+            self._delta[token].add(pos)
+        self._delta_rows.add(pos)
+        if len(self._delta_rows) > max(1024, len(self._docs) // 8):
+            self.compact()
+
+    def compact(self) -> None:
+        """Fold the delta index back into the bulk base"""
+        self._build(self._docs)
+
+    def _match_prefix(self, prefix: str) -> np.ndarray:
+        lo = bisect.bisect_left(self._vocab, prefix)
+        hi = bisect.bisect_left(self._vocab, prefix + "\uffff")
+        base = self._postings[self._offsets[lo]:self._offsets[hi]]
+        base = base[self._base_alive[base]]
+        lo = bisect.bisect_left(self._delta_vocab, prefix)
+        hi = bisect.bisect_left(self._delta_vocab, prefix + "\uffff")
+        delta = [pos for token in self._delta_vocab[lo:hi] for pos in self._delta[token]]
+        if delta:
+            base = np.concatenate([base, np.array(delta, dtype=np.int64)])
+        return np.unique(base)
+
+    def search(self, query: str) -> Optional[np.ndarray]:
+        """Sorted positions of rows matching every query token as a word prefix
+
+        Returns ``None`` when the query has no searchable tokens.
+        """
+        tokens = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not tokens:
+            return None
+        result = self._match_prefix(tokens[0])
+        for token in tokens[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, self._match_prefix(token), assume_unique=True)
+        return result
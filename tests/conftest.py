@@ -0,0 +1,66 @@
+from datetime import date, datetime
+from typing import Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.routers.bookings import BOOKING_INDEXES, Booking, booking_slot_claims
+from backend.storage import SQLiteDatabase, SQLiteRepository, reset_storage
+from data.availability import get_availability_store
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """The API over a fresh SQLite store in ``tmp_path``"""
+    monkeypatch.setenv("CLEANFEE_STORAGE", "sqlite")
+    monkeypatch.setenv("CLEANFEE_DB_PATH", str(tmp_path / "cleanfee.db"))
+    reset_storage()
+    from backend.main import create_app
+
+    with TestClient(create_app()) as client:
+        yield client
+    reset_storage()
+
+
+def open_slot(skip: int = 0) -> Tuple[int, date, str]:
+    """A cleaner, day from tomorrow on, and slot that is still free; the ``skip`` earlier ones are passed over"""
+    store = get_availability_store()
+    for day in store.horizon()[1:]:
+        for cleaner_id in store.cleaner_ids:
+            for slot in store.available_slots(int(cleaner_id), day):
+                if skip == 0:
+                    return int(cleaner_id), day, slot
+                skip -= 1
+    raise LookupError("No free slot left")
+
+
+def booking_payload(cleaner_id: int, day: str, time_slot: str, **extra) -> dict:
+    return {
+        "cleaner_id": cleaner_id,
+        "customer_name": "Test Customer",
+        "customer_phone": "+15550000000",
+        "address": "1 Main St",
+        "date": day,
+        "time_slot": time_slot,
+        **extra,
+    }
+
+
+def open_worker(path) -> SQLiteRepository:
+    """The bookings repository as one more API worker sharing the file would open it"""
+    return SQLiteRepository(SQLiteDatabase(str(path)), "bookings", Booking, booking_slot_claims, BOOKING_INDEXES)
+
+
+def make_booking(n: int, day: str, time_slot: str = "9:00 AM", cleaner_id: int = 1, duration: int = 1, **fields) -> Booking:
+    return Booking(
+        id=f"CF-{n}",
+        created_at=datetime(2026, 10, 1, 12, 0, n),
+        cleaner_id=cleaner_id,
+        customer_name="Test Customer",
+        customer_phone="+15550000000",
+        address="1 Main St",
+        date=day,
+        time_slot=time_slot,
+        duration=duration,
+        **fields,
+    )
@@ -0,0 +1,145 @@
+import base64
+import csv
+import io
+import json
+import sqlite3
+
+import pytest
+
+from backend.routers import bookings as bookings_router
+from backend.routers.bookings import bookings_repository
+from data.availability import SLOT_INDEX
+from data.catalog import rebuild_catalog
+from conftest import booking_payload, make_booking, open_slot, open_worker
+
+
+def test_booking_dates_are_stored_canonically(client):
+    cleaner_id, day, time_slot = open_slot()
+    response = client.post("/api/bookings", json=booking_payload(cleaner_id, day.strftime("%Y%m%d"), time_slot))
+    assert response.status_code == 200
+    assert response.json()["date"] == day.isoformat()
+
+    # The same slot spelled either way is taken, and the conflict names the canonical day
+    for spelling in (day.isoformat(), day.strftime("%Y%m%d")):
+        response = client.post("/api/bookings", json=booking_payload(cleaner_id, spelling, time_slot))
+        assert response.status_code == 409
+        assert day.isoformat() in response.json()["detail"]
+
+
+def test_date_filter_finds_bookings_made_with_any_spelling(client):
+    cleaner_id, day, time_slot = open_slot()
+    booking = client.post("/api/bookings", json=booking_payload(cleaner_id, day.strftime("%Y%m%d"), time_slot)).json()
+    for spelling in (day.isoformat(), day.strftime("%Y%m%d")):
+        listed = client.get("/api/bookings", params={"date": spelling, "cleaner_id": cleaner_id}).json()
+        assert [b["id"] for b in listed] == [booking["id"]]
+        paged = client.get("/api/bookings", params={"date": spelling, "limit": 10}).json()
+        assert [b["id"] for b in paged] == [booking["id"]]
+    assert client.get("/api/bookings", params={"date": "2026-02-30"}).status_code == 422
+
+
+def test_failed_store_gives_the_slots_back(client, monkeypatch):
+    cleaner_id, day, time_slot = open_slot()
+    payload = booking_payload(cleaner_id, day.isoformat(), time_slot)
+
+    def locked(booking):
+        raise sqlite3.OperationalError("database is locked")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(bookings_repository(), "add", locked)
+        with pytest.raises(sqlite3.OperationalError):
+            client.post("/api/bookings", json=payload)
+
+    grid = client.get("/api/availability", params={"cleaner_ids": cleaner_id, "from": day.isoformat(), "to": day.isoformat()})
+    assert grid.json()["cleaners"][str(cleaner_id)][0] >> SLOT_INDEX[time_slot] & 1
+    assert client.post("/api/bookings", json=payload).status_code == 200
+
+
+def test_ratings_stored_by_another_worker_count_once(client, tmp_path):
+    rebuild_catalog()
+    before = client.get("/api/cleaners/2").json()
+    other = open_worker(tmp_path / "cleanfee.db")
+    other.add(make_booking(1, "2026-10-01", cleaner_id=2, status="completed", rating=1, review="Missed the kitchen"))
+    other.db.close()
+
+    def ratings():
+        cleaner = client.get("/api/cleaners/2").json()
+        comments = [r["comment"] for r in client.get("/api/cleaners/2/reviews").json()]
+        return cleaner["total_reviews"], cleaner["rating"], comments.count("Missed the kitchen")
+
+    expected = round((before["rating"] * before["total_reviews"] + 1) / (before["total_reviews"] + 1), 2)
+    assert ratings() == (before["total_reviews"] + 1, expected, 1)
+    # A rebuilt catalog starts over from its source records and takes the rating in again
+    rebuild_catalog()
+    assert ratings() == (before["total_reviews"] + 1, expected, 1)
+
+
+def test_rating_a_booking_counts_once(client):
+    cleaner_id, day, time_slot = open_slot()
+    before = client.get(f"/api/cleaners/{cleaner_id}").json()["total_reviews"]
+    booking = client.post("/api/bookings", json=booking_payload(cleaner_id, day.isoformat(), time_slot)).json()
+    for status in ("confirmed", "completed"):
+        client.post(f"/api/bookings/{booking['id']}/status", json={"status": status})
+    response = client.post(f"/api/bookings/{booking['id']}/rating", json={"rating": 5, "comment": "Spotless"})
+    assert response.json()["rating"] == 5
+    assert client.get(f"/api/cleaners/{cleaner_id}").json()["total_reviews"] == before + 1
+    assert client.post(f"/api/bookings/{booking['id']}/rating", json={"rating": 4}).status_code == 409
+
+
+def test_booking_pages_follow_cursors(client):
+    created = []
+    for _ in range(3):
+        cleaner_id, day, time_slot = open_slot()
+        created.append(client.post("/api/bookings", json=booking_payload(cleaner_id, day.isoformat(), time_slot)).json()["id"])
+    first = client.get("/api/bookings", params={"limit": 2, "fields": "id"})
+    assert [b["id"] for b in first.json()] == created[:2]
+    second = client.get("/api/bookings", params={"limit": 2, "after": first.headers["X-Next-Cursor"]})
+    assert [b["id"] for b in second.json()] == created[2:]
+    assert "X-Next-Cursor" not in second.headers
+
+
+@pytest.mark.parametrize("after", [
+    "not base64!",
+    base64.urlsafe_b64encode(b'["yesterday","CF-1"]').decode(),
+    base64.urlsafe_b64encode(b'["2026-10-01T12:00:00",["CF-1"]]').decode(),
+    base64.urlsafe_b64encode(b'["2026-10-01T12:00:00"]').decode(),
+])
+def test_malformed_booking_cursors_are_rejected(client, after):
+    response = client.get("/api/bookings", params={"limit": 2, "after": after})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Malformed cursor"
+
+
+def test_slots_booked_by_another_worker_are_taken_here(client, tmp_path):
+    cleaner_id, day, time_slot = open_slot()
+    other = open_worker(tmp_path / "cleanfee.db")
+    other.add(make_booking(1, day.isoformat(), time_slot=time_slot, cleaner_id=cleaner_id))
+
+    def is_open():
+        params = {"cleaner_ids": cleaner_id, "from": day.isoformat(), "to": day.isoformat()}
+        return bool(client.get("/api/availability", params=params).json()["cleaners"][str(cleaner_id)][0] >> SLOT_INDEX[time_slot] & 1)
+
+    assert not is_open()
+    assert client.post("/api/bookings", json=booking_payload(cleaner_id, day.isoformat(), time_slot)).status_code == 409
+    other.update("CF-1", lambda b: b.model_copy(update={"status": "cancelled"}))
+    other.db.close()
+    assert is_open()
+    assert client.post("/api/bookings", json=booking_payload(cleaner_id, day.isoformat(), time_slot)).status_code == 200
+
+
+def test_export_streams_every_match_in_chunks(client, monkeypatch):
+    monkeypatch.setattr(bookings_router, "EXPORT_CHUNK_SIZE", 2)
+    created = []
+    for _ in range(5):
+        cleaner_id, day, time_slot = open_slot()
+        created.append(client.post("/api/bookings", json=booking_payload(cleaner_id, day.isoformat(), time_slot)).json())
+    client.post(f"/api/bookings/{created[1]['id']}/status", json={"status": "cancelled"})
+
+    response = client.get("/api/bookings/export", params={"status": "pending", "fields": "id,date"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == [{"id": b["id"], "date": b["date"]} for b in created if b is not created[1]]
+
+    response = client.get("/api/bookings/export", params={"format": "csv", "fields": "id,status"})
+    assert list(csv.reader(io.StringIO(response.text))) == [["id", "status"]] + [
+        [b["id"], "cancelled" if b is created[1] else "pending"] for b in created
+    ]
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from data.catalog import SORT_KEYS, CleanerCatalog
+from data.generator import generate_marketplace
+
+SORTS = (None, *SORT_KEYS)
+
+
+@pytest.fixture
+def cleaners():
+    return generate_marketplace(cleaners=200, seed=3)["cleaners"]
+
+
+def edited(catalog: CleanerCatalog, cleaners, seed: int = 0) -> CleanerCatalog:
+    """``catalog`` after a run of random edits and additions, each a new version"""
+    rng = np.random.default_rng(seed)
+    next_id = max(c["id"] for c in cleaners) + 1
+    for step in range(150):
+        if step % 10 == 9:
+            record = dict(cleaners[int(rng.integers(len(cleaners)))], id=next_id)
+            catalog = catalog.add_cleaner(record)
+            next_id += 1
+            continue
+        cleaner_id = int(catalog.ids[rng.integers(len(catalog))])
+        catalog = catalog.update_cleaner(cleaner_id, {
+            "rating": float(rng.choice([3.5, 4.0, 4.5, 5.0])),
+            "hourly_rate": float(rng.integers(15, 60)),
+            "total_reviews": int(rng.integers(0, 300)),
+            "experience_years": int(rng.integers(0, 20)),
+        })
+    return catalog
+
+
+def test_sort_indexes_follow_edits(cleaners):
+    catalog = CleanerCatalog(cleaners)
+    catalog.warm()
+    catalog = edited(catalog, cleaners)
+    rebuilt = CleanerCatalog(catalog.records)
+    for sort_by in SORTS:
+        assert catalog.order(sort_by).tolist() == rebuilt.order(sort_by).tolist()
+
+
+def test_edits_leave_earlier_versions_untouched(cleaners):
+    original = CleanerCatalog(cleaners)
+    original.warm()
+    snapshot = (list(original.records), {s: original.order(s).tolist() for s in SORTS}, original.skill_vocab[:])
+    catalog = original
+    for n, cleaner_id in enumerate(original.ids[:40].tolist()):
+        catalog = catalog.update_cleaner(cleaner_id, {
+            "name": f"Renamed Sparkle{n}",
+            "skills": ["Carpet Shampoo"] if n % 2 else [],
+            "rating": 1.0,
+        })
+    catalog = edited(catalog, cleaners, seed=1)
+
+    assert (list(original.records), {s: original.order(s).tolist() for s in SORTS}, original.skill_vocab) == snapshot
+    assert not original.text_mask("sparkle0").any()
+    assert not original.skills_mask(["Carpet Shampoo"]).any()
+
+    rebuilt = CleanerCatalog(catalog.records)
+    for query in ("sparkle0", "renamed", "deep clean"):
+        assert catalog.text_mask(query).tolist() == rebuilt.text_mask(query).tolist()
+    for skills in (["Carpet Shampoo"], ["Deep Cleaning", "Eco-friendly"]):
+        for match_all in (False, True):
+            assert catalog.skills_mask(skills, match_all).tolist() == rebuilt.skills_mask(skills, match_all).tolist()
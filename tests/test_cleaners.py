@@ -0,0 +1,63 @@
+import base64
+import json
+
+import pytest
+
+from data.cleaners_data import add_review
+
+
+def cursor(*parts) -> str:
+    return base64.urlsafe_b64encode(json.dumps(parts).encode()).decode().rstrip("=")
+
+
+def test_keyset_pages_cover_every_cleaner_once(client):
+    everyone = [c["id"] for c in client.get("/api/cleaners", params={"sort": "rating"}).json()]
+    seen, after = [], None
+    while True:
+        params = {"sort": "rating", "limit": 2, **({"after": after} if after else {})}
+        response = client.get("/api/cleaners", params=params)
+        seen += [c["id"] for c in response.json()]
+        after = response.headers.get("X-Next-Cursor")
+        if after is None:
+            break
+    assert seen == everyone
+
+
+@pytest.mark.parametrize("after", [
+    "not base64!",
+    cursor("rating", None, 1),
+    cursor("rating", [1, 2], 1),
+    cursor("rating", "4.5", 1),
+    cursor("rating", True, 1),
+    cursor("rating", -4.5, [1]),
+    cursor("rating", -4.5, 1.5),
+    base64.urlsafe_b64encode(b'["rating", NaN, 1]').decode(),
+])
+def test_malformed_cursors_are_rejected(client, after):
+    response = client.get("/api/cleaners", params={"sort": "rating", "limit": 2, "after": after})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Malformed cursor"
+
+
+def test_cursor_for_another_sort_is_rejected(client):
+    response = client.get("/api/cleaners", params={"sort": "price", "limit": 2, "after": cursor("rating", -4.5, 1)})
+    assert response.status_code == 400
+
+
+def test_conditional_gets_answer_304_until_the_data_changes(client):
+    for path, params in (("/api/cleaners", {"sort": "rating"}), ("/api/cleaners/facets", {}), ("/api/cleaners/3", {}),
+                         ("/api/cleaners/3/reviews", {})):
+        first = client.get(path, params=params)
+        etag = first.headers["ETag"]
+        again = client.get(path, params=params, headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.content == b""
+        assert client.get(path, params=params, headers={"If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+
+    paths = ("/api/cleaners", "/api/cleaners/3", "/api/cleaners/3/reviews", "/api/cleaners/4")
+    etags = {path: client.get(path).headers["ETag"] for path in paths}
+    add_review(3, {"user": "Test", "rating": 2, "comment": "", "date": "2026-10-18"})
+    assert client.get("/api/cleaners", headers={"If-None-Match": etags["/api/cleaners"]}).status_code == 200
+    assert client.get("/api/cleaners/3", headers={"If-None-Match": etags["/api/cleaners/3"]}).status_code == 200
+    assert client.get("/api/cleaners/3/reviews", headers={"If-None-Match": etags["/api/cleaners/3/reviews"]}).status_code == 200
+    # Other cleaners' records did not change, so their copies stay valid
+    assert client.get("/api/cleaners/4", headers={"If-None-Match": etags["/api/cleaners/4"]}).status_code == 304
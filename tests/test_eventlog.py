@@ -0,0 +1,127 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import BaseModel
+
+from backend.storage import ClaimConflict, EventLogRepository
+
+
+class Item(BaseModel):
+    id: str
+    created_at: datetime
+    owner: int
+    status: str = "active"
+
+
+def owner_claim(item: Item):
+    return [(item.owner,)] if item.status == "active" else []
+
+
+T0 = datetime(2026, 1, 1)
+
+
+def make(n: int, owner: int = None) -> Item:
+    return Item(id=f"I{n:04d}", created_at=T0 + timedelta(seconds=n), owner=n if owner is None else owner)
+
+
+def open_repo(directory, snapshot_every: int = 10_000) -> EventLogRepository:
+    return EventLogRepository(
+        str(directory), "items", Item, owner_claim, indexes=("owner", "status"),
+        snapshot_every=snapshot_every, fsync=False,
+    )
+
+
+def wait_for_snapshot(repo: EventLogRepository, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while repo._snapshotting and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not repo._snapshotting
+
+
+def test_replay_restores_records_claims_and_indexes(tmp_path):
+    repo = open_repo(tmp_path)
+    for n in range(5):
+        repo.add(make(n))
+    repo.update("I0001", lambda item: item.model_copy(update={"status": "done"}))
+    repo.close()
+
+    repo = open_repo(tmp_path)
+    assert [item.id for item in repo.list()] == ["I0000", "I0001", "I0002", "I0003", "I0004"]
+    assert repo.get("I0001").status == "done"
+    assert [item.id for item in repo.find(status="done")] == ["I0001"]
+    # The finished record gave its claim back; the others still hold theirs
+    repo.add(make(5, owner=1))
+    with pytest.raises(ClaimConflict):
+        repo.add(make(6, owner=2))
+    repo.close()
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    repo = open_repo(tmp_path)
+    for n in range(3):
+        repo.add(make(n))
+    segment = repo.log.segment_path(repo.log.segments()[-1])
+    repo.close()
+    intact = os.path.getsize(segment)
+    with open(segment, "ab") as f:
+        # A header promising more payload than was written, as after a crash mid-append
+        f.write(b"\x00\x00\x01\x00\xde\xad\xbe\xef{\"op\":")
+
+    repo = open_repo(tmp_path)
+    assert os.path.getsize(segment) == intact
+    assert len(repo) == 3
+    repo.add(make(3))
+    repo.close()
+
+    repo = open_repo(tmp_path)
+    assert [item.id for item in repo.list()] == ["I0000", "I0001", "I0002", "I0003"]
+    repo.close()
+
+
+def test_snapshot_rotates_and_drops_covered_segments(tmp_path):
+    repo = open_repo(tmp_path, snapshot_every=4)
+    for n in range(4):
+        repo.add(make(n))
+    wait_for_snapshot(repo)
+    assert os.path.exists(os.path.join(tmp_path, "items.snapshot.json"))
+    assert repo.log.segments() == [1]
+    repo.add(make(4))
+    repo.update("I0000", lambda item: item.model_copy(update={"status": "done"}))
+    repo.close()
+
+    repo = open_repo(tmp_path, snapshot_every=4)
+    assert len(repo) == 5
+    assert repo.get("I0000").status == "done"
+    assert [item.id for item in repo.find(owner=4)] == ["I0004"]
+    repo.close()
+
+
+def test_failed_append_is_rolled_back(tmp_path, monkeypatch):
+    repo = EventLogRepository(str(tmp_path), "items", Item, owner_claim, indexes=("owner",), fsync=True)
+    repo.add(make(0))
+    revision, _ = repo.changes_since(None)
+
+    def failing_fsync(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "fsync", failing_fsync)
+    with pytest.raises(OSError):
+        repo.add(make(1))
+    with pytest.raises(OSError):
+        repo.update("I0000", lambda item: item.model_copy(update={"status": "done"}))
+    monkeypatch.undo()
+
+    assert repo.get("I0001") is None
+    assert repo.get("I0000").status == "active"
+    assert repo.find(owner=1) == []
+    # Callers following changes must reload rather than miss the rollback
+    assert repo.changes_since(revision)[1] is None
+    # The rolled-back claim is free again, and the log holds only what was acknowledged
+    repo.add(make(2, owner=1))
+    repo.close()
+
+    repo = open_repo(tmp_path)
+    assert [(item.id, item.status) for item in repo.list()] == [("I0000", "active"), ("I0002", "active")]
+    repo.close()
@@ -0,0 +1,36 @@
+from collections import Counter
+
+import pytest
+
+from data.catalog import CleanerCatalog
+from data.cleaner_query import CleanerQuery
+from data.facets import EXPERIENCE_BUCKETS, compute_facets
+from data.generator import generate_marketplace
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return CleanerCatalog(generate_marketplace(cleaners=300, seed=5)["cleaners"])
+
+
+def test_each_facet_ignores_its_own_filter(catalog):
+    query = CleanerQuery.build(min_rating=4.4, max_rate=40, skills=["Deep Cleaning"])
+    facets = compute_facets(catalog, query)
+    rated = [c for c in catalog.records if c["rating"] >= 4.4]
+    priced = [c for c in catalog.records if c["hourly_rate"] <= 40]
+    skilled = [c for c in catalog.records if "Deep Cleaning" in c["skills"]]
+
+    def both(first, second):
+        return [c for c in first if c in second]
+
+    matches = both(both(rated, priced), skilled)
+    assert facets["total"] == len(matches)
+    skill_counts = Counter(s for c in both(rated, priced) for s in c["skills"])
+    assert {f["skill"]: f["count"] for f in facets["skills"]} == dict(skill_counts)
+    counts = [f["count"] for f in facets["skills"]]
+    assert counts == sorted(counts, reverse=True)
+    assert sum(b["count"] for b in facets["rating"]["histogram"]) == len(both(priced, skilled))
+    assert sum(b["count"] for b in facets["hourly_rate"]["histogram"]) == len(both(rated, skilled))
+    assert facets["experience"] == [
+        {"min_years": t, "count": sum(c["experience_years"] >= t for c in matches)} for t in EXPERIENCE_BUCKETS
+    ]
@@ -0,0 +1,87 @@
+import multiprocessing
+import threading
+
+import pytest
+
+from data import ids
+from data.ids import EPOCH_MS, MAX_SEQUENCE, IdGenerator, lease_worker_id, new_id, worker_id_range
+
+
+@pytest.fixture
+def lock_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(ids.WORKER_LOCK_DIR_ENV, str(tmp_path))
+    monkeypatch.setattr(ids, "_LEASE", None)
+    monkeypatch.setattr(ids, "_GENERATOR", None)
+    return tmp_path
+
+
+@pytest.mark.parametrize("configured, expected", [("7", (7, 7)), ("2-9", (2, 9)), ("0-1023", (0, 1023))])
+def test_worker_id_range(monkeypatch, configured, expected):
+    monkeypatch.setenv(ids.WORKER_IDS_ENV, configured)
+    assert worker_id_range() == expected
+
+
+@pytest.mark.parametrize("configured", ["a-b", "9-2", "0-1024", "-3"])
+def test_worker_id_range_rejects_bad_ranges(monkeypatch, configured):
+    monkeypatch.setenv(ids.WORKER_IDS_ENV, configured)
+    with pytest.raises(ValueError):
+        worker_id_range()
+
+
+def test_leases_take_the_lowest_free_number(lock_dir, monkeypatch):
+    monkeypatch.setenv(ids.WORKER_IDS_ENV, "3-4")
+    assert lease_worker_id() == 3
+    held = ids._LEASE
+    assert lease_worker_id() == 4
+    with pytest.raises(RuntimeError):
+        lease_worker_id()
+    held.close()
+    # A released number is free again
+    assert lease_worker_id() == 3
+
+
+def _report_worker_id(barrier, results) -> None:
+    new_id()
+    results.put(ids._GENERATOR.worker_id)
+    # Stay alive, holding the lease, until every process has leased one
+    barrier.wait(timeout=10)
+
+
+def test_forked_workers_lease_distinct_numbers(lock_dir):
+    context = multiprocessing.get_context("fork")
+    new_id()
+    barrier, results = context.Barrier(4), context.Queue()
+    workers = [context.Process(target=_report_worker_id, args=(barrier, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    leased = sorted(results.get(timeout=10) for _ in workers)
+    for worker in workers:
+        worker.join(timeout=10)
+    assert ids._GENERATOR.worker_id not in leased
+    assert len(set(leased)) == 4
+
+
+def test_ids_stay_ordered_when_the_clock_steps_back():
+    now, earlier = (EPOCH_MS + 1000) * 1_000_000, (EPOCH_MS + 500) * 1_000_000
+    ticks = iter([now] + [earlier] * (MAX_SEQUENCE + 2))
+    generator = IdGenerator(worker_id=1, clock=lambda: next(ticks))
+    values = [generator.next_int() for _ in range(MAX_SEQUENCE + 3)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+def test_threads_never_share_an_id():
+    generator = IdGenerator(worker_id=2)
+    per_thread = [[] for _ in range(8)]
+
+    def draw(out):
+        out.extend(generator.next_id("CF-") for _ in range(5000))
+
+    threads = [threading.Thread(target=draw, args=(out,)) for out in per_thread]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for out in per_thread:
+        assert out == sorted(out)
+    assert len({i for out in per_thread for i in out}) == 8 * 5000
@@ -0,0 +1,95 @@
+import threading
+from datetime import date, datetime
+
+import pytest
+
+from data.availability import (
+    SLOT_INDEX, AvailabilityStore, booking_bits, drop_slots, get_availability_store, replace_reservations,
+    reserve_slots, slot_has_started,
+)
+from data.catalog import get_catalog
+from data.reservations import ReservationBook, SlotConflict
+
+MORNING = booking_bits(SLOT_INDEX["9:00 AM"], 3)
+
+
+@pytest.fixture
+def free_morning():
+    """A cleaner and day, from tomorrow on, whose 9-12 morning is open, in an empty book"""
+    replace_reservations([])
+    store = get_availability_store()
+    for day in store.horizon()[1:]:
+        for cleaner_id in store.cleaner_ids:
+            if store.slot_bits(int(cleaner_id), day) & MORNING == MORNING:
+                yield int(cleaner_id), day
+                replace_reservations([])
+                return
+    pytest.skip("No open morning in the generated availability")
+
+
+def test_booking_bits_respect_the_day_and_the_lunch_gap():
+    assert booking_bits(SLOT_INDEX["9:00 AM"], 3) == 0b111
+    assert booking_bits(SLOT_INDEX["2:00 PM"], 2) == 0b110000
+    assert booking_bits(SLOT_INDEX["11:00 AM"], 2) is None
+    assert booking_bits(SLOT_INDEX["5:00 PM"], 2) is None
+
+
+def test_overlapping_bookings_conflict(free_morning):
+    cleaner_id, day = free_morning
+    reserve_slots(cleaner_id, day, "10:00 AM", 2)
+    for time_slot, duration in (("9:00 AM", 2), ("11:00 AM", 1), ("10:00 AM", 1)):
+        with pytest.raises(SlotConflict):
+            reserve_slots(cleaner_id, day, time_slot, duration)
+    reserve_slots(cleaner_id, day, "9:00 AM", 1)
+    assert get_availability_store().slot_bits(cleaner_id, day) & MORNING == 0
+    with pytest.raises(ValueError):
+        reserve_slots(cleaner_id, day, "11:00 AM", 2)
+
+
+def test_dropped_slots_open_again(free_morning):
+    cleaner_id, day = free_morning
+    bits = reserve_slots(cleaner_id, day, "9:00 AM", 3)
+    drop_slots(cleaner_id, day, bits)
+    assert get_availability_store().slot_bits(cleaner_id, day) & MORNING == MORNING
+    reserve_slots(cleaner_id, day, "10:00 AM", 1)
+
+
+def test_only_one_of_many_racing_reservations_wins(free_morning):
+    cleaner_id, day = free_morning
+    start, outcomes = threading.Barrier(16), []
+
+    def book(time_slot):
+        start.wait()
+        try:
+            reserve_slots(cleaner_id, day, time_slot, 1 if time_slot == "9:00 AM" else 2)
+            outcomes.append(time_slot)
+        except SlotConflict:
+            pass
+
+    threads = [threading.Thread(target=book, args=(("9:00 AM", "10:00 AM")[n % 2],)) for n in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(outcomes) == ["10:00 AM", "9:00 AM"]
+
+
+def test_store_nets_out_the_book():
+    book = ReservationBook()
+    catalog = get_catalog()
+    cleaner_id, day = int(catalog.ids[0]), date(2026, 1, 5)
+    book.mark(cleaner_id, day, 0b11)
+    store = AvailabilityStore(catalog, day, days=3, reservations=book)
+    assert store.slot_bits(cleaner_id, day) == int(store.base[0, 0]) & ~0b11
+    book.unmark(cleaner_id, day, 0b01)
+    store.unbook(cleaner_id, day)
+    assert store.slot_bits(cleaner_id, day) == int(store.base[0, 0]) & ~0b10
+    book.replace([(cleaner_id, day, 0b100), (cleaner_id, day, 0b1)])
+    assert book.booked_bits(cleaner_id, day) == 0b101
+
+
+def test_slot_has_started():
+    day = date(2026, 10, 20)
+    assert slot_has_started(day, "9:00 AM", now=datetime(2026, 10, 20, 9, 1))
+    assert not slot_has_started(day, "10:00 AM", now=datetime(2026, 10, 20, 9, 59))
+    assert not slot_has_started(day, "9:00 AM", now=datetime(2026, 10, 19, 23, 0))
@@ -0,0 +1,53 @@
+from datetime import date, datetime, time
+
+import numpy as np
+import pytest
+
+from data.availability import SLOT_HOURS, TIME_SLOTS, AvailabilityStore, booking_bits
+from data.catalog import CleanerCatalog
+from data.generator import generate_marketplace
+from data.ranking import ranked
+from data.reservations import ReservationBook
+from data.slot_search import earliest_slots
+
+START = date(2026, 10, 20)
+
+
+@pytest.fixture(scope="module")
+def market():
+    catalog = CleanerCatalog(generate_marketplace(cleaners=300, seed=7, today=START)["cleaners"])
+    book = ReservationBook()
+    rng = np.random.default_rng(7)
+    for cleaner_id in rng.choice(catalog.ids, 100, replace=False):
+        book.mark(int(cleaner_id), START, 0b11111111)
+    return catalog, AvailabilityStore(catalog, START, days=10, reservations=book)
+
+
+def brute_force(catalog, store, mask, duration, limit, not_before):
+    rank = {int(pos): r for r, pos in enumerate(ranked(catalog)[1])}
+    starts = []
+    for pos in np.flatnonzero(mask):
+        for col, day in enumerate(store.horizon()):
+            free = int(store.bits[pos, col])
+            for slot, hour in enumerate(SLOT_HOURS):
+                needed = booking_bits(slot, duration)
+                if needed is None or free & needed != needed or datetime.combine(day, time(hour)) < not_before:
+                    continue
+                starts.append((day, slot, rank[int(pos)], int(catalog.ids[pos])))
+    return [(cleaner_id, day, TIME_SLOTS[slot]) for day, slot, _, cleaner_id in sorted(starts)[:limit]]
+
+
+@pytest.mark.parametrize("duration", [1, 2, 4])
+@pytest.mark.parametrize("not_before", [datetime(2026, 10, 20, 8, 0), datetime(2026, 10, 20, 13, 30)])
+def test_earliest_slots_match_a_full_scan(market, duration, not_before):
+    catalog, store = market
+    mask = catalog.rating >= 4.3
+    found = earliest_slots(mask, duration, 40, not_before=not_before, catalog=catalog, store=store)
+    assert [tuple(match) for match in found] == brute_force(catalog, store, mask, duration, 40, not_before)
+
+
+def test_nothing_before_the_horizon_or_for_an_empty_mask(market):
+    catalog, store = market
+    everyone = np.ones(len(catalog), dtype=bool)
+    assert earliest_slots(everyone, 1, 5, not_before=datetime(2026, 10, 1), catalog=catalog, store=store) == []
+    assert earliest_slots(~everyone, 1, 5, not_before=datetime(2026, 10, 20), catalog=catalog, store=store) == []
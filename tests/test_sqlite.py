@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+from backend.storage import ClaimConflict
+from backend.storage import sqlite as sqlite_storage
+from conftest import make_booking, open_worker
+
+
+def test_workers_reject_a_slot_claimed_by_another_worker(tmp_path):
+    first, second = open_worker(tmp_path / "cleanfee.db"), open_worker(tmp_path / "cleanfee.db")
+    first.add(make_booking(1, "2026-10-25", duration=2))
+    # The second hour of the first booking, spelled as a basic-format date
+    with pytest.raises(ClaimConflict):
+        second.add(make_booking(2, "20261025", time_slot="10:00 AM"))
+    with pytest.raises(ClaimConflict):
+        second.add(make_booking(3, "2026-10-25"))
+    second.add(make_booking(4, "2026-10-25", time_slot="11:00 AM"))
+    assert [b.id for b in first.list()] == ["CF-1", "CF-4"]
+    first.db.close()
+    second.db.close()
+
+
+def confirm(booking):
+    if booking.status != "pending":
+        raise ValueError(f"already {booking.status}")
+    return booking.model_copy(update={"status": "confirmed"})
+
+
+@pytest.fixture
+def workers(tmp_path):
+    first, second = open_worker(tmp_path / "cleanfee.db"), open_worker(tmp_path / "cleanfee.db")
+    yield first, second
+    first.db.close()
+    second.db.close()
+
+
+def test_workers_follow_each_others_changes(workers):
+    first, second = workers
+    revision, everything = second.changes_since(None)
+    assert everything is None
+    first.add(make_booking(1, "2026-10-25"))
+    first.add(make_booking(2, "2026-10-26"))
+    first.update("CF-1", lambda b: b.model_copy(update={"status": "cancelled"}))
+    revision, changed = second.changes_since(revision)
+    assert sorted((b.id, b.status) for b in changed) == [("CF-1", "cancelled"), ("CF-2", "pending")]
+    assert second.changes_since(revision) == (revision, [])
+    # The cancelled booking gave its slot back, to any worker
+    second.add(make_booking(3, "2026-10-25"))
+    first.replace_all([make_booking(4, "2026-10-27")])
+    assert second.changes_since(revision)[1] is None
+    assert [b.id for b in second.list()] == ["CF-4"]
+
+
+def test_workers_far_behind_reload_everything(workers, monkeypatch):
+    monkeypatch.setattr(sqlite_storage, "MAX_CHANGES", 10)
+    first, second = workers
+    revision, _ = second.changes_since(None)
+    first.add(make_booking(1, "2026-10-25"))
+    recent, _ = second.changes_since(None)
+    for n in range(2, 20):
+        first.add(make_booking(n, "2026-10-25", cleaner_id=n))
+    assert second.changes_since(revision)[1] is None
+    current, changed = second.changes_since(recent + 10)
+    assert len(changed) == current - recent - 10
+
+
+def test_racing_updates_from_two_workers_apply_once(workers):
+    first, second = workers
+    first.add(make_booking(1, "2026-10-25"))
+    start, outcomes = threading.Barrier(8), []
+
+    def transition(repo):
+        start.wait()
+        try:
+            outcomes.append(repo.update("CF-1", confirm).status)
+        except ValueError:
+            pass
+
+    threads = [threading.Thread(target=transition, args=(workers[n % 2],)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert outcomes == ["confirmed"]
@@ -0,0 +1,100 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from backend.routers.bookings import BOOKING_INDEXES, Booking, booking_slot_claims
+from backend.storage import EventLogRepository, MemoryRepository
+from conftest import open_worker
+
+STATUSES = ("pending", "confirmed", "completed", "cancelled")
+T0 = datetime(2026, 10, 1, 8, 0)
+
+
+def open_repo(engine: str, directory):
+    if engine == "memory":
+        return MemoryRepository(Booking, booking_slot_claims, BOOKING_INDEXES)
+    if engine == "sqlite":
+        return open_worker(directory / "cleanfee.db")
+    return EventLogRepository(str(directory), "bookings", Booking, booking_slot_claims, BOOKING_INDEXES, fsync=False)
+
+
+def close_repo(repo) -> None:
+    repo.close()
+    if hasattr(repo, "db"):
+        repo.db.close()
+
+
+@pytest.fixture(params=["memory", "sqlite", "eventlog"])
+def repo(request, tmp_path):
+    repo = open_repo(request.param, tmp_path)
+    yield repo
+    close_repo(repo)
+
+
+def sample(n: int) -> Booking:
+    # Distinct (cleaner, day, slot) per booking, and created_at shared by several
+    return Booking(
+        id=f"CF-{n:04d}",
+        created_at=T0 + timedelta(seconds=n % 50),
+        status=STATUSES[n % 4],
+        cleaner_id=n % 5 + 1,
+        customer_name="Test Customer",
+        customer_phone=f"+1555000{n % 3}",
+        address="1 Main St",
+        date=(date(2026, 10, 20) + timedelta(days=n // 40)).isoformat(),
+        time_slot=["9:00 AM", "10:00 AM", "11:00 AM", "1:00 PM", "2:00 PM", "3:00 PM", "4:00 PM", "5:00 PM"][n // 5 % 8],
+    )
+
+
+def fill(repo) -> None:
+    for n in range(200):
+        repo.add(sample(n))
+    for n in range(0, 200, 7):
+        repo.update(f"CF-{n:04d}", lambda b: b.model_copy(update={"status": "cancelled"}))
+    for n in range(0, 200, 11):
+        repo.update(f"CF-{n:04d}", lambda b: b.model_copy(update={"customer_phone": "+15559999"}))
+
+
+CRITERIA = [
+    {"status": "cancelled"},
+    {"cleaner_id": 3},
+    {"date": "2026-10-22", "status": "pending"},
+    {"cleaner_id": 2, "customer_phone": "+15559999"},
+    {"cleaner_id": 4, "date": "2026-10-21", "status": "confirmed", "customer_phone": "+15550001"},
+    {"status": "completed", "date": "2030-01-01"},
+]
+
+
+def matching(repo, criteria):
+    return [b for b in repo.list() if all(getattr(b, field) == value for field, value in criteria.items())]
+
+
+@pytest.mark.parametrize("criteria", CRITERIA)
+def test_find_matches_a_scan_after_updates(repo, criteria):
+    fill(repo)
+    assert sorted(b.id for b in repo.find(**criteria)) == sorted(b.id for b in matching(repo, criteria))
+
+
+@pytest.mark.parametrize("criteria", [{}] + CRITERIA)
+def test_pages_walk_every_match_in_order(repo, criteria):
+    fill(repo)
+    expected = sorted(matching(repo, criteria), key=lambda b: (b.created_at, b.id))
+    seen, after = [], None
+    while True:
+        page = repo.page(7, after, **criteria)
+        seen += page
+        if len(page) < 7:
+            break
+        after = (page[-1].created_at, page[-1].id)
+    assert [b.id for b in seen] == [b.id for b in expected]
+
+
+@pytest.mark.parametrize("engine", ["sqlite", "eventlog"])
+def test_indexes_survive_a_restart(engine, tmp_path):
+    repo = open_repo(engine, tmp_path)
+    fill(repo)
+    before = {str(c): sorted(b.id for b in repo.find(**c)) for c in CRITERIA}
+    close_repo(repo)
+    repo = open_repo(engine, tmp_path)
+    assert {str(c): sorted(b.id for b in repo.find(**c)) for c in CRITERIA} == before
+    close_repo(repo)